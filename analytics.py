@@ -0,0 +1,141 @@
+# Необязательный движок статистики на NumPy: записи загружаются в компактные столбцы,
+# суммы по сотрудникам считаются векторно. Без NumPy используется обычный путь Database.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from database import Database
+
+BATCH_SIZE = 100_000
+
+
+def is_available():
+    return np is not None
+
+
+class RecordColumns:
+    # Полные рабочие дни (есть и приход, и уход) в виде столбцов вместе со сменой каждой записи
+    __slots__ = ("employee_ids", "days", "arrivals", "departures", "shift_starts", "shift_ends")
+
+    def __init__(self, employee_ids, days, arrivals, departures, shift_starts, shift_ends):
+        self.employee_ids = employee_ids
+        self.days = days
+        self.arrivals = arrivals
+        self.departures = departures
+        self.shift_starts = shift_starts
+        self.shift_ends = shift_ends
+
+    def __len__(self):
+        return len(self.days)
+
+
+def load_records(database, batch_size=BATCH_SIZE):
+    # Порядок по дате (покрывающие индексы по date) позволяет выбирать период срезом.
+    # Все даты архива раньше активных записей, поэтому архив просто читается первым.
+    # Пустая смена записи - смена по умолчанию из work_settings.
+    tables = ("time_records",) if database.get_archive_boundary() is None else ("time_records_archive", "time_records")
+
+    batches = []
+    for table in tables:
+        cursor = database.conn.execute(f'''
+        SELECT employee_id, date, arrival_time, departure_time,
+               COALESCE(shift_start, (SELECT start_time FROM work_settings WHERE id = 1)),
+               COALESCE(shift_end, (SELECT end_time FROM work_settings WHERE id = 1))
+        FROM {table}
+        WHERE arrival_time IS NOT NULL AND departure_time IS NOT NULL
+        ORDER BY date''')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batches.append(np.array(rows, dtype=np.int32))
+        cursor.close()
+
+    table = np.concatenate(batches) if batches else np.empty((0, 6), dtype=np.int32)
+    return RecordColumns(
+        table[:, 0].copy(),
+        table[:, 1].copy(),
+        table[:, 2].astype(np.int16),
+        table[:, 3].astype(np.int16),
+        table[:, 4].astype(np.int16),
+        table[:, 5].astype(np.int16)
+    )
+
+
+def select_period(columns, date_from=None, date_to=None):
+    start = 0 if date_from is None else np.searchsorted(columns.days, date_from, side="left")
+    end = len(columns) if date_to is None else np.searchsorted(columns.days, date_to, side="right")
+    return RecordColumns(
+        columns.employee_ids[start:end],
+        columns.days[start:end],
+        columns.arrivals[start:end],
+        columns.departures[start:end],
+        columns.shift_starts[start:end],
+        columns.shift_ends[start:end]
+    )
+
+
+def employee_sums(columns, employee_ids):
+    # Суммы в порядке employee_ids; записи сотрудников не из списка не учитываются
+    employee_ids = np.asarray(employee_ids, dtype=np.int32)
+    order = np.argsort(employee_ids)
+    sorted_ids = employee_ids[order]
+
+    positions = np.searchsorted(sorted_ids, columns.employee_ids)
+    positions = np.minimum(positions, max(len(sorted_ids) - 1, 0))
+    known = (sorted_ids[positions] == columns.employee_ids) if len(sorted_ids) else np.zeros(len(columns), bool)
+    groups = order[positions[known]]
+
+    arrivals = columns.arrivals[known].astype(np.int64)
+    departures = columns.departures[known].astype(np.int64)
+    shift_starts = columns.shift_starts[known].astype(np.int64)
+    shift_ends = columns.shift_ends[known].astype(np.int64)
+    size = len(employee_ids)
+
+    # Веса в bincount - float64, суммы минут точно представимы вплоть до 2**53
+    delay = np.bincount(groups, weights=np.maximum(arrivals - shift_starts, 0), minlength=size)
+    overtime = np.bincount(groups, weights=np.maximum(departures - shift_ends, 0), minlength=size)
+    workday = np.bincount(groups, weights=departures - arrivals, minlength=size)
+    days = np.bincount(groups, minlength=size)
+
+    return delay.astype(np.int64), overtime.astype(np.int64), workday.astype(np.int64), days
+
+
+class StatsEngine:
+    # Держит столбцы в памяти и перечитывает их только после изменения базы: data_version
+    # меняется при коммитах других соединений, total_changes - при изменениях этого
+    def __init__(self, database):
+        self.database = database
+        self.columns = None
+        self._version = None
+
+    def load(self):
+        version = (self.database.conn.execute("PRAGMA data_version").fetchone()[0], self.database.conn.total_changes)
+        if self.columns is None or version != self._version:
+            self.columns = load_records(self.database)
+            self._version = version
+        return self.columns
+
+    def get_all_stats(self, date_from=None, date_to=None):
+        if np is None:
+            return self.database.get_all_stats(date_from, date_to)
+
+        employee_ids = [row[0] for row in self.database.conn.execute("SELECT id FROM employees")]
+        columns = select_period(self.load(), date_from, date_to)
+        delay, overtime, workday, days = employee_sums(columns, employee_ids)
+
+        return Database.summarize_stats(zip(
+            employee_ids, delay.tolist(), overtime.tolist(), workday.tolist(), days.tolist()
+        ))
+
+    def get_company_stats(self, date_from=None, date_to=None):
+        return self.get_all_stats(date_from, date_to)["company"]
+
+
+def get_all_stats(database, date_from=None, date_to=None):
+    return StatsEngine(database).get_all_stats(date_from, date_to)
+
+
+def get_company_stats(database, date_from=None, date_to=None):
+    return get_all_stats(database, date_from, date_to)["company"]
@@ -0,0 +1,35 @@
+import argparse
+import sys
+from datetime import date, datetime
+from database import Database
+from import_records import positive_int
+from models import date_to_day, day_to_date
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос закрытых периодов в архив")
+    parser.add_argument("--db", default="employee_time_tracking.db", help="путь к базе данных")
+    boundary = parser.add_mutually_exclusive_group(required=True)
+    boundary.add_argument("--years", type=positive_int, help="оставить активными только N последних календарных лет")
+    boundary.add_argument("--before", help="перенести записи раньше даты ГГГГ-ММ-ДД")
+    args = parser.parse_args()
+
+    if args.years is not None:
+        day = date_to_day(date(date.today().year - args.years + 1, 1, 1))
+    else:
+        try:
+            day = date_to_day(datetime.strptime(args.before, "%Y-%m-%d").date())
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+
+    db = Database(args.db)
+    try:
+        moved = db.archive_before(day)
+        print(f"Перенесено в архив записей: {moved}, архив до {day_to_date(db.get_archive_boundary()):%d.%m.%Y}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
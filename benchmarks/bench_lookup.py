@@ -0,0 +1,81 @@
+# Стоимость поиска записи по (employee_id, date) в зависимости от размера time_records.
+# Запуск из корня проекта: python -m benchmarks.bench_lookup --sizes 10000 100000 1000000
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from migrations import MIGRATIONS, migrate
+
+# История одного сотрудника фиксирована, таблица растёт за счёт числа сотрудников
+DAYS = 250
+# 2000-01-01 в днях от 1970-01-01
+FIRST_DAY = 10957
+
+
+def build_database(path, size, schema_version):
+    conn = sqlite3.connect(path)
+    migrate(conn, schema_version)
+
+    employees = max(1, size // DAYS)
+    conn.executemany("INSERT INTO employees (id, name, position, hire_date) VALUES (?, ?, ?, ?)",
+                     ((i, f"Сотрудник {i}", "Инженер", "2000-01-01") for i in range(1, employees + 1)))
+    # Начиная со схемы с графиками смен в записи хранится и её смена
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(time_records)")}
+    if "shift_start" in columns:
+        sql = ("INSERT INTO time_records (employee_id, date, arrival_time, departure_time, shift_start, shift_end) "
+               "VALUES (?, ?, ?, ?, 540, 1080)")
+    else:
+        sql = "INSERT INTO time_records (employee_id, date, arrival_time, departure_time) VALUES (?, ?, ?, ?)"
+    conn.executemany(sql, ((employee_id, FIRST_DAY + day, 545, 1090)
+                           for day in range(DAYS) for employee_id in range(1, employees + 1)))
+    conn.commit()
+    return conn, employees
+
+
+def time_lookups(conn, employees, lookups):
+    keys = [(random.randint(1, employees), FIRST_DAY + random.randrange(DAYS))
+            for _ in range(lookups)]
+
+    started = time.perf_counter()
+    for key in keys:
+        conn.execute("SELECT id FROM time_records WHERE employee_id = ? AND date = ?", key).fetchone()
+    point = (time.perf_counter() - started) / lookups
+
+    started = time.perf_counter()
+    for employee_id, _ in keys:
+        conn.execute(
+            "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? ORDER BY date DESC",
+            (employee_id,)
+        ).fetchall()
+    history = (time.perf_counter() - started) / lookups
+
+    return point, history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска записей учёта времени")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--baseline", action="store_true",
+                        help="также замерить схему без индексов (медленно на больших размерах)")
+    args = parser.parse_args()
+
+    versions = [len(MIGRATIONS)]
+    if args.baseline:
+        versions.insert(0, 1)
+
+    print(f"{'rows':>10} {'schema':>7} {'point, us':>10} {'history, us':>12}")
+    for size in args.sizes:
+        for version in versions:
+            with tempfile.TemporaryDirectory() as tmp:
+                conn, employees = build_database(os.path.join(tmp, "bench.db"), size, version)
+                point, history = time_lookups(conn, employees, args.lookups)
+                conn.close()
+            print(f"{employees * DAYS:>10} {version:>7} {point * 1e6:>10.1f} {history * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
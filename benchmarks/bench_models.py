@@ -0,0 +1,92 @@
+# Память и время на загрузку больших историй: кортежи, прежние классы с __dict__,
+# модели-кортежи из row_factory и потоковый обход без списка.
+# Запуск из корня проекта: python -m benchmarks.bench_models --employees 200 --years 10
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate
+from database import Database
+
+HISTORY_SQL = "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? ORDER BY date DESC"
+
+
+class DictTimeRecord:
+    # Прежняя модель: обычный класс, каждый экземпляр со своим __dict__
+    def __init__(self, day=None, arrival=None, departure=None):
+        self.day = day
+        self.arrival = arrival
+        self.departure = departure
+
+
+def load_tuples(db, employee_ids):
+    rows = []
+    for employee_id in employee_ids:
+        rows.extend(db.conn.execute(HISTORY_SQL, (employee_id,)).fetchall())
+    return rows
+
+
+def load_dict_objects(db, employee_ids):
+    rows = []
+    for employee_id in employee_ids:
+        rows.extend(DictTimeRecord(*row) for row in db.conn.execute(HISTORY_SQL, (employee_id,)).fetchall())
+    return rows
+
+
+def load_models(db, employee_ids):
+    rows = []
+    for employee_id in employee_ids:
+        rows.extend(db.get_time_records(employee_id))
+    return rows
+
+
+def walk_iterator(db, employee_ids):
+    # Строки не сохраняются: в памяти одновременно только текущая порция
+    count = 0
+    for employee_id in employee_ids:
+        for record in db.iter_time_records(employee_id):
+            count += record.arrival is not None
+    return count
+
+
+def measure(func, db, employee_ids):
+    # Время замеряется отдельно: под tracemalloc каждое выделение памяти заметно дороже
+    started = time.perf_counter()
+    result = func(db, employee_ids)
+    elapsed = time.perf_counter() - started
+    del result
+
+    tracemalloc.start()
+    result = func(db, employee_ids)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память на строку при загрузке истории записей")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "models.db")
+        generate(path, args.employees, args.years)
+        db = Database(path)
+        employee_ids = [row[0] for row in db.conn.execute("SELECT id FROM employees")]
+        count = db.conn.execute("SELECT COUNT(*) FROM time_records").fetchone()[0]
+        print(f"записей: {count}")
+
+        for name, func in (("кортежи", load_tuples), ("классы с __dict__", load_dict_objects),
+                           ("модели", load_models), ("итератор", walk_iterator)):
+            elapsed, retained, peak = measure(func, db, employee_ids)
+            print(f"{name:>20}  {elapsed * 1e9 / count:7.0f} нс/строка  "
+                  f"удержано {retained / count:6.1f} Б/строка  пик {peak / 1024 / 1024:7.1f} МБ")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
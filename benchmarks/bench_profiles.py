@@ -0,0 +1,50 @@
+# Пропускная способность записи для каждого профиля соединения Database.
+# Запуск из корня проекта: python -m benchmarks.bench_profiles --single 2000 --bulk 200000
+import argparse
+import os
+import tempfile
+import time
+
+from database import PROFILES, Database
+
+EMPLOYEES = 100
+
+
+def bench_profile(path, profile, single, bulk):
+    db = Database(path, profile)
+    for i in range(EMPLOYEES):
+        db.add_employee(f"Сотрудник {i}", "Инженер", "2020-01-01")
+
+    # Одна запись - один коммит, как при сохранении из интерфейса
+    started = time.perf_counter()
+    for i in range(single):
+        db.add_time_record(i % EMPLOYEES + 1, i // EMPLOYEES, 545, 1090)
+    single_rate = single / (time.perf_counter() - started)
+
+    # Массовый импорт одной транзакцией
+    first_day = single // EMPLOYEES + 1
+    started = time.perf_counter()
+    db.add_time_records_bulk((i % EMPLOYEES + 1, first_day + i // EMPLOYEES, 545, 1090) for i in range(bulk))
+    bulk_rate = bulk / (time.perf_counter() - started)
+
+    db.close()
+    return single_rate, bulk_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи для профилей соединения")
+    parser.add_argument("--single", type=int, default=2000, help="число записей с коммитом на каждую")
+    parser.add_argument("--bulk", type=int, default=200_000, help="число записей в массовом импорте")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':>10} {'single, rows/s':>15} {'bulk, rows/s':>13}")
+    for profile in args.profiles:
+        # База создаётся рядом с проектом: /tmp часто в памяти, и fsync там ничего не стоит
+        with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmp:
+            single_rate, bulk_rate = bench_profile(os.path.join(tmp, "bench.db"), profile, args.single, args.bulk)
+        print(f"{profile:>10} {single_rate:>15.0f} {bulk_rate:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
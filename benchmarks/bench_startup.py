@@ -0,0 +1,108 @@
+# Время запуска интерфейса на большой базе: каждый прогон - отдельный процесс, от импорта
+# модулей до показа окна и загрузки данных первой вкладки. Для сравнения замеряется запуск,
+# при котором все вкладки строятся и заполняются сразу, как до ленивого построения.
+# Запуск из корня проекта: python -m benchmarks.bench_startup --employees 2000 --years 2
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+STAGES = ("импорт", "база открыта", "окно построено", "окно показано", "первая вкладка", "статистика")
+
+
+def child(path, eager):
+    # Запросы выполняются синхронно, без фонового потока, чтобы этапы не перекрывались
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from database import Database
+    from ui import MainWindow
+
+    timings = [time.perf_counter()]
+    app = QApplication([])
+    db = Database(path)
+    timings.append(time.perf_counter())
+
+    window = MainWindow(db)
+    if eager:
+        for index in (MainWindow.TIME_TAB, MainWindow.STATS_TAB, MainWindow.EMPLOYEE_TAB):
+            window.tabs.setCurrentIndex(index)
+    timings.append(time.perf_counter())
+
+    window.show()
+    timings.append(time.perf_counter())
+
+    # Первый цикл событий: отрисовка окна и отложенная загрузка открытой вкладки
+    app.processEvents()
+    timings.append(time.perf_counter())
+
+    window.tabs.setCurrentIndex(MainWindow.STATS_TAB)
+    app.processEvents()
+    timings.append(time.perf_counter())
+
+    window.close()
+    db.close()
+    print(json.dumps([(moment - STARTED) * 1000 for moment in timings]))
+
+
+def run(path, eager, runs):
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child", path]
+    if eager:
+        command.append("--eager")
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    return [statistics.median(stage) for stage in zip(*samples)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время запуска интерфейса на большой базе")
+    parser.add_argument("--db", help="готовая база (по умолчанию генерируется синтетическая)")
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.eager)
+        return
+
+    from benchmarks.synthetic import generate
+    from database import Database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        if args.db is None:
+            generate(path, args.employees, args.years)
+        else:
+            # Первое открытие мигрирует базу и переводит её в WAL: это делается один раз на копии,
+            # чтобы исходная база не менялась, а все прогоны запускались на одинаковой базе
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(path)
+            source.backup(target)
+            target.close()
+            source.close()
+            Database(path).close()
+
+        results = {"ленивые вкладки": run(path, False, args.runs),
+                   "все вкладки сразу": run(path, True, args.runs)}
+
+    print(f"медиана по {args.runs} запускам, мс от старта процесса")
+    print(f"{'':>16}" + "".join(f"{name:>20}" for name in results))
+    for i, stage in enumerate(STAGES):
+        print(f"{stage:>16}" + "".join(f"{timings[i]:>20.1f}" for timings in results.values()))
+
+
+if __name__ == "__main__":
+    main()
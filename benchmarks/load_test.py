@@ -0,0 +1,119 @@
+# Нагрузочный тест HTTP-сервиса терминалов: сколько событий в секунду выдерживает групповая запись.
+# Запуск из корня проекта: python -m benchmarks.load_test --clients 50 --duration 10
+# По умолчанию сервер поднимается в этом же процессе на временной базе; --port - внешний сервер.
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate
+from server import ClockServer
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, deadline, employees, batch, rng, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    events = 0
+    errors = 0
+    day = 0
+
+    while time.perf_counter() < deadline:
+        day += 1
+        items = [{
+            "employee_id": rng.randint(1, employees),
+            "type": rng.choice(("in", "out")),
+            "date": f"2030-{day % 12 + 1:02d}-{day % 28 + 1:02d}",
+            "time": f"{rng.randint(7, 19):02d}:{rng.randint(0, 59):02d}"
+        } for _ in range(batch)]
+
+        started = time.perf_counter()
+        if batch == 1:
+            item = items[0]
+            status = await request(reader, writer, host, "/clock-in" if item["type"] == "in" else "/clock-out", item)
+        else:
+            status = await request(reader, writer, host, "/events", {"events": items})
+        latencies.append(time.perf_counter() - started)
+
+        if status == 200:
+            events += batch
+        else:
+            errors += 1
+
+    writer.close()
+    return events, errors
+
+
+async def run(args):
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        port = args.port
+        if port is None:
+            path = os.path.join(tmp, "load.db")
+            generate(path, args.employees, years=0)
+            server = ClockServer(path, max_batch=args.max_batch)
+            listener = await server.start(args.host, 0)
+            port = listener.sockets[0].getsockname()[1]
+
+        latencies = []
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            client(args.host, port, deadline, args.employees, args.batch, random.Random(i), latencies)
+            for i in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+        events = sum(result[0] for result in results)
+        errors = sum(result[1] for result in results)
+        print(f"клиентов: {args.clients}, событий в запросе: {args.batch}, длительность: {elapsed:.1f} с")
+        print(f"событий: {events} ({events / elapsed:.0f}/с), ошибок: {errors}")
+        if latencies:
+            latencies.sort()
+            print(f"задержка запроса: p50 {statistics.median(latencies) * 1000:.1f} мс, "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} мс")
+
+        if server is not None:
+            print(f"коммитов: {server.commits}, событий на коммит: {server.events_written / max(server.commits, 1):.1f}")
+            await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP-сервиса терминалов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="порт уже запущенного сервера")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=1, help="событий в одном запросе (1 - clock-in/clock-out)")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--max-batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
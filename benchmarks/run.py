@@ -0,0 +1,195 @@
+# Замеры горячих путей Database и обновления интерфейса на синтетической базе.
+# Запуск из корня проекта: python -m benchmarks.run --employees 5000 --years 3 --output bench.json
+# Сравнение с прошлым прогоном: python -m benchmarks.run --compare old.json --output new.json
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import analytics
+from benchmarks.synthetic import generate
+from database import Database
+from models import date_to_day
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "mean_ms": statistics.fmean(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings)
+    }
+
+
+def cold(db, func):
+    # Замер без кэша Database, как при первом обращении после изменения данных
+    def run():
+        db.invalidate_caches()
+        func()
+    return run
+
+
+def bench_database(db, repeat, rng):
+    employee_ids = [row[0] for row in db.conn.execute("SELECT id FROM employees")]
+    # В базе без записей периоды отсчитываются от сегодняшнего дня
+    last_day = db.conn.execute("SELECT MAX(date) FROM time_records").fetchone()[0]
+    if last_day is None:
+        last_day = date_to_day(date.today())
+    results = {}
+
+    next_day = iter(range(last_day + 1, last_day + 1 + repeat))
+    results["add_time_record"] = measure(
+        lambda: db.add_time_record(rng.choice(employee_ids), next(next_day), 545, 1090), repeat)
+    results["get_time_records"] = measure(cold(db, lambda: db.get_time_records(rng.choice(employee_ids))), repeat)
+    results["get_time_records_page"] = measure(
+        cold(db, lambda: db.get_time_records(rng.choice(employee_ids), limit=200)), repeat)
+    results["get_all_employees"] = measure(cold(db, db.get_all_employees), repeat)
+    results["get_employee_stats"] = measure(cold(db, lambda: db.get_employee_stats(rng.choice(employee_ids))), repeat)
+    results["get_employee_stats_month"] = measure(
+        cold(db, lambda: db.get_employee_stats(rng.choice(employee_ids), last_day - 30, last_day)), repeat)
+    results["get_company_stats"] = measure(cold(db, db.get_company_stats), repeat)
+    results["get_company_stats_cached"] = measure(db.get_company_stats, repeat)
+    results["get_company_stats_month"] = measure(cold(db, lambda: db.get_company_stats(last_day - 30, last_day)),
+                                                 repeat)
+    results["get_period_stats_month"] = measure(cold(db, lambda: db.get_period_stats("month")), repeat)
+    results["search_employees_build"] = measure(cold(db, lambda: db.search_employees("иванов")),
+                                                max(1, repeat // 5))
+    results["search_employees_prefix"] = measure(lambda: db.search_employees("ив"), repeat)
+    results["search_employees_typo"] = measure(lambda: db.search_employees("ивнов мари"), repeat)
+    results["get_schedule_index"] = measure(cold(db, db.get_schedule_index), repeat)
+    results["add_schedule_employee"] = measure(
+        lambda: db.add_schedule(600, 1140, employee_id=rng.choice(employee_ids), date_from=last_day - 30), repeat)
+
+    if analytics.is_available():
+        engine = analytics.StatsEngine(db)
+        results["analytics_load"] = measure(lambda: analytics.load_records(db), max(1, repeat // 5))
+        engine.load()
+        results["analytics_company_stats"] = measure(engine.get_company_stats, repeat)
+        results["analytics_company_stats_month"] = measure(
+            lambda: engine.get_company_stats(last_day - 30, last_day), repeat)
+    return results
+
+
+def bench_ui(db, repeat):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        print("PySide6 не установлен, замеры интерфейса пропущены", file=sys.stderr)
+        return {}
+    from ui import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+
+    results["MainWindow.__init__"] = measure(cold(db, lambda: MainWindow(db).close()), 1)
+    window = MainWindow(db)
+    # Вкладки строятся при первом показе
+    for index in (MainWindow.TIME_TAB, MainWindow.STATS_TAB):
+        window.tabs.setCurrentIndex(index)
+    employee_id = window.employee_combo.currentData()
+    results["refresh_employees_list"] = measure(cold(db, window.refresh_employees_list), repeat)
+    results["refresh_time_history"] = measure(cold(db, lambda: window.refresh_time_history(employee_id)), repeat)
+    results["refresh_statistics"] = measure(cold(db, window.refresh_statistics), repeat)
+    window.close()
+    app.processEvents()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    print(f"{'benchmark':>32} {'before, ms':>11} {'after, ms':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median_ms"]
+        after = result["median_ms"]
+        ratio = after / before if before else float("inf")
+        print(f"{name:>32} {before:>11.3f} {after:>10.3f} {ratio:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк горячих путей Database и интерфейса")
+    parser.add_argument("--db", help="готовая база (по умолчанию генерируется синтетическая)")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-ui", action="store_true", help="не замерять обновление интерфейса")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        if args.db is None:
+            generate(path, args.employees, args.years, seed=args.seed)
+        else:
+            # Замеры пишут в базу (записи, графики смен), поэтому работают с копией:
+            # исходная база не меняется, и повторные прогоны сравнимы
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(path)
+            source.backup(target)
+            target.close()
+            source.close()
+
+        db = Database(path)
+        rows = db.conn.execute("SELECT COUNT(*) FROM time_records").fetchone()[0]
+        employees = db.count_employees()
+        if not employees:
+            parser.error("в базе нет сотрудников")
+
+        results = bench_database(db, args.repeat, random.Random(args.seed))
+        if not args.no_ui:
+            results.update(bench_ui(db, args.repeat))
+        db.close()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "employees": employees,
+            "time_records": rows,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+    for name, result in results.items():
+        print(f"{name:>32} {result['median_ms']:>10.3f} ms")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
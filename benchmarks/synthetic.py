@@ -0,0 +1,70 @@
+# Генератор синтетической базы: сотрудники с ежедневными записями за несколько лет.
+# Запуск из корня проекта: python -m benchmarks.synthetic bench.db --employees 5000 --years 3
+import argparse
+import random
+from datetime import date, timedelta
+
+from database import Database
+from models import date_to_day
+
+POSITIONS = ("Инженер", "Старший инженер", "Тестировщик", "Аналитик", "Дизайнер", "Менеджер проекта")
+FIRST_NAMES = ("Иван", "Пётр", "Алексей", "Мария", "Елена", "Анна", "Дмитрий", "Ольга", "Сергей", "Наталья")
+LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Козлов", "Николаев", "Смирнов", "Кузнецов", "Попов", "Волков", "Соколов")
+
+
+def generate_records(employee_ids, first_day, last_day, rng, absence_rate, missing_departure_rate):
+    day = first_day
+    while day <= last_day:
+        # Выходные пропускаем
+        if day.weekday() < 5:
+            day_number = date_to_day(day)
+            for employee_id in employee_ids:
+                if rng.random() < absence_rate:
+                    continue
+                arrival = int(rng.gauss(9 * 60, 12))
+                departure = None
+                if rng.random() >= missing_departure_rate:
+                    departure = int(rng.gauss(18 * 60 + 10, 25))
+                yield employee_id, day_number, arrival, departure
+        day += timedelta(days=1)
+
+
+def generate(path, employees=1000, years=1, absence_rate=0.05, missing_departure_rate=0.03, seed=1,
+             end=None):
+    rng = random.Random(seed)
+    last_day = end or date.today()
+    first_day = last_day - timedelta(days=365 * years)
+
+    db = Database(path, "bulk")
+    db.conn.executemany(
+        "INSERT INTO employees (name, position, hire_date) VALUES (?, ?, ?)",
+        ((f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {i}", rng.choice(POSITIONS), first_day.isoformat())
+         for i in range(employees))
+    )
+    db.conn.commit()
+
+    employee_ids = [row[0] for row in db.conn.execute("SELECT id FROM employees")]
+    count = db.add_time_records_bulk(
+        generate_records(employee_ids, first_day, last_day, rng, absence_rate, missing_departure_rate),
+        chunk_size=100_000
+    )
+    db.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация синтетической базы учёта времени")
+    parser.add_argument("path")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--absence-rate", type=float, default=0.05)
+    parser.add_argument("--missing-departure-rate", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    count = generate(args.path, args.employees, args.years, args.absence_rate, args.missing_departure_rate, args.seed)
+    print(f"Создано записей: {count}")
+
+
+if __name__ == "__main__":
+    main()
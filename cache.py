@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    # Ограниченный кэш с вытеснением давно не использованных значений и счётчиками попаданий
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def peek(self, key):
+        # Значение без учёта в счётчиках и без изменения порядка вытеснения
+        return self._data.get(key, MISSING)
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, predicate=None):
+        # Без условия очищается весь кэш, иначе только ключи, для которых predicate(key) истинно
+        if predicate is None:
+            self._data.clear()
+            return
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize
+        }
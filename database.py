@@ -1,198 +1,791 @@
 import sqlite3
-from datetime import datetime
+from itertools import chain, islice
+from cache import MISSING, LRUCache
+from employee_search import EmployeeSearchIndex
+from migrations import migrate
+from models import Employee, TimeRecord, day_to_date, row_factory, time_to_minutes
+from schedules import ScheduleIndex
+
+_UPSERT_TIME_RECORD = '''
+INSERT INTO time_records (employee_id, date, arrival_time, departure_time, shift_start, shift_end)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (employee_id, date) DO UPDATE SET
+    arrival_time = excluded.arrival_time,
+    departure_time = excluded.departure_time'''
+
+# Отметки терминала меняют только свой столбец: приход утром и уход вечером пишутся без чтения строки
+_RECORD_ARRIVAL = '''
+INSERT INTO time_records (employee_id, date, arrival_time, shift_start, shift_end) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (employee_id, date) DO UPDATE SET arrival_time = excluded.arrival_time'''
+
+_RECORD_DEPARTURE = '''
+INSERT INTO time_records (employee_id, date, departure_time, shift_start, shift_end) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (employee_id, date) DO UPDATE SET departure_time = excluded.departure_time'''
+
+# Смена записей сотрудника за интервал дней; строки, где она не изменилась, не перезаписываются
+_ASSIGN_SHIFT = '''
+UPDATE time_records SET shift_start = ?, shift_end = ?
+WHERE employee_id = ? AND date BETWEEN ? AND ? AND (shift_start IS NOT ? OR shift_end IS NOT ?)'''
+
+_CLOCK_STATEMENTS = {"in": _RECORD_ARRIVAL, "out": _RECORD_DEPARTURE}
+
+# Смена записи; пустая - смена по умолчанию из work_settings (подзапрос вычисляется один раз на запрос)
+_SHIFT_START = "COALESCE(r.shift_start, (SELECT start_time FROM work_settings WHERE id = 1))"
+_SHIFT_END = "COALESCE(r.shift_end, (SELECT end_time FROM work_settings WHERE id = 1))"
+
+# Суммы опозданий, переработок и длительности дня в минутах относительно смены каждой записи
+_STATS_SUMS = f'''
+    SUM(MAX(r.arrival_time - {_SHIFT_START}, 0)) AS delay_minutes,
+    SUM(MAX(r.departure_time - {_SHIFT_END}, 0)) AS overtime_minutes,
+    SUM(r.departure_time - r.arrival_time) AS workday_minutes,
+    COUNT(*) AS days'''
+
+_VALID_RECORD = "r.arrival_time IS NOT NULL AND r.departure_time IS NOT NULL"
+
+# Активные записи вместе с архивом для агрегатов; условия по r.date SQLite переносит внутрь
+# обеих частей UNION ALL. Сортировку по объединению SQLite делает во временном B-дереве,
+# поэтому потоковые выборки читают таблицы по очереди (см. _records_tables)
+_ALL_RECORDS = '''(
+    SELECT employee_id, date, arrival_time, departure_time, shift_start, shift_end FROM time_records
+    UNION ALL
+    SELECT employee_id, date, arrival_time, departure_time, shift_start, shift_end FROM time_records_archive
+)'''
+
+# Суммы за всё время: активные записи (employee_stats) плюс замороженные суммы архивных лет
+_TOTAL_STATS = '''(
+    SELECT employee_id,
+           SUM(delay_minutes) AS delay_minutes,
+           SUM(overtime_minutes) AS overtime_minutes,
+           SUM(workday_minutes) AS workday_minutes,
+           SUM(days) AS days
+    FROM (
+        SELECT employee_id, delay_minutes, overtime_minutes, workday_minutes, days FROM employee_stats
+        UNION ALL
+        SELECT employee_id, delay_minutes, overtime_minutes, workday_minutes, days FROM archived_stats
+    )
+    GROUP BY employee_id
+)'''
+
+# Ключи группировки для get_period_stats: понедельник недели (номер дня), месяц "YYYY-MM", должность
+_PERIOD_BUCKETS = {
+    "week": "r.date - ((r.date + 3) % 7 + 7) % 7",
+    "month": "strftime('%Y-%m', r.date * 86400, 'unixepoch')",
+    "position": "e.position",
+}
+
+
+# Профили настройки соединения. Внешние ключи включены во всех профилях,
+# иначе ON DELETE CASCADE в time_records не срабатывает.
+PROFILES = {
+    # Настройки SQLite по умолчанию: журнал отката и fsync на каждый коммит
+    "compat": {
+        "cached_statements": 128,
+        "pragmas": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+        },
+    },
+    # WAL: читатели не блокируют запись, fsync только при контрольных точках
+    "balanced": {
+        "cached_statements": 512,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64 * 1024,
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+    },
+    # Для массового импорта: без fsync, последние транзакции могут потеряться при сбое питания
+    "bulk": {
+        "cached_statements": 512,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -256 * 1024,
+            "mmap_size": 1024 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+    },
+}
+
+DEFAULT_PROFILE = "balanced"
+
 
 class Database:
-    def __init__(self, db_name="employee_time_tracking.db"):
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name="employee_time_tracking.db", profile=DEFAULT_PROFILE, stats_cache_size=1024):
+        settings = PROFILES[profile]
+
+        self.db_name = db_name
+        self.profile = profile
+        self.conn = sqlite3.connect(db_name, cached_statements=settings["cached_statements"])
+        for pragma, value in settings["pragmas"].items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
         self.cursor = self.conn.cursor()
-        self._create_tables()
+        # Сотрудники и записи читаются в модели - кортежи без __dict__ у каждого экземпляра
+        self.employee_cursor = self._model_cursor(Employee)
+        self.record_cursor = self._model_cursor(TimeRecord)
+
+        # Миграции пересоздают таблицы, поэтому внешние ключи включаются после них
+        migrate(self.conn)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+        # Кэши чтения. Свои изменения сбрасывают их явно, чужие коммиты (другое соединение,
+        # фоновый поток) обнаруживаются по PRAGMA data_version.
+        self.settings_cache = LRUCache(2)
+        self.schedule_cache = LRUCache(1)
+        self.employee_cache = LRUCache(1024)
+        self.stats_cache = LRUCache(stats_cache_size)
+        # Поисковый индекс строится при первом поиске, свои изменения вносятся в него точечно.
+        # Он зависит только от employees, поэтому сбрасывается по счётчику employees_version,
+        # а не по data_version: записи учёта и настройки на него не влияют
+        self.search_cache = LRUCache(1)
+        self._search_version = None
+        self._data_version = None
+
+    def _model_cursor(self, model):
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory(model)
+        return cursor
+
+    def cache_stats(self):
+        return {
+            "work_settings": self.settings_cache.stats(),
+            "schedules": self.schedule_cache.stats(),
+            "employees": self.employee_cache.stats(),
+            "stats": self.stats_cache.stats(),
+            "search": self.search_cache.stats()
+        }
 
-    def _create_tables(self):
-        # Таблица настроек рабочего времени
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS work_settings (
-            id INTEGER PRIMARY KEY,
-            start_time TEXT,
-            end_time TEXT
-        )''')
-
-        self.cursor.execute("SELECT COUNT(*) FROM work_settings")
-        if self.cursor.fetchone()[0] == 0:
-            self.cursor.execute("INSERT INTO work_settings (start_time, end_time) VALUES (?, ?)",
-                               ("09:00", "18:00"))
-
-        # Таблица сотрудников
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            position TEXT NOT NULL,
-            hire_date TEXT NOT NULL
-        )''')
-
-        # Таблица учета рабочего времени
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS time_records (
-            id INTEGER PRIMARY KEY,
-            employee_id INTEGER,
-            date TEXT,
-            arrival_time TEXT,
-            departure_time TEXT,
-            FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
-        )''')
+    def invalidate_caches(self):
+        self._invalidate_query_caches()
+        self.search_cache.invalidate()
 
-        self.conn.commit()
+    def _invalidate_query_caches(self):
+        self.settings_cache.invalidate()
+        self.schedule_cache.invalidate()
+        self.employee_cache.invalidate()
+        self.stats_cache.invalidate()
+
+    def _cached(self, cache, key, load, *args):
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._invalidate_query_caches()
+            self._data_version = data_version
+
+        value = cache.get(key)
+        if value is MISSING:
+            value = cache.put(key, load(*args))
+        return value
+
+    def _invalidate_employee_stats(self, employee_id):
+        # Сводные значения по компании и группам зависят от любого сотрудника
+        self.stats_cache.invalidate(lambda key: key[0] != "employee" or key[1] == employee_id)
 
     def add_employee(self, name, position, hire_date):
         self.cursor.execute("INSERT INTO employees (name, position, hire_date) VALUES (?, ?, ?)",
                           (name, position, hire_date))
         self.conn.commit()
-        return self.cursor.lastrowid
+        employee_id = self.cursor.lastrowid
+
+        self.employee_cache.invalidate()
+        self.schedule_cache.invalidate()
+        self._invalidate_employee_stats(employee_id)
+
+        self._update_search_index(lambda index: index.add(Employee(employee_id, name, position, hire_date)))
+        return employee_id
 
     def remove_employee(self, employee_id):
         self.cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
         self.conn.commit()
 
-    def get_all_employees(self):
-        self.cursor.execute("SELECT id, name, position, hire_date FROM employees ORDER BY name")
-        return self.cursor.fetchall()
+        self.employee_cache.invalidate()
+        self.schedule_cache.invalidate()
+        self._invalidate_employee_stats(employee_id)
+
+        self._update_search_index(lambda index: index.remove(employee_id))
+
+    def search_employees(self, query, limit=20):
+        # Сотрудники, у которых каждое слово запроса совпадает с началом слова ФИО или должности
+        # либо похоже на него (опечатки), лучшие совпадения первыми
+        version = self._load_employees_version()
+        if version != self._search_version:
+            self.search_cache.invalidate()
+            self._search_version = version
+
+        index = self.search_cache.get("index")
+        if index is MISSING:
+            index = self.search_cache.put("index", self._build_search_index())
+        return index.search(query, limit)
+
+    def _update_search_index(self, update):
+        # Своё изменение вносится в индекс точечно, только если до него сотрудников никто
+        # не менял; иначе индекс перестроится при следующем поиске
+        index = self.search_cache.peek("index")
+        if index is MISSING:
+            return
+        version = self._load_employees_version()
+        if version == self._search_version + 1:
+            update(index)
+            self._search_version = version
+        elif version != self._search_version:
+            self.search_cache.invalidate()
+
+    def _load_employees_version(self):
+        self.cursor.execute("SELECT version FROM employees_version WHERE id = 1")
+        return self.cursor.fetchone()[0]
+
+    def _build_search_index(self):
+        return EmployeeSearchIndex(self.iter_employees())
+
+    def get_all_employees(self, limit=-1, after=None):
+        return self._cached(self.employee_cache, ("page", limit, after), self._load_employees, limit, after)
+
+    def count_employees(self):
+        return self._cached(self.employee_cache, ("count",), self._load_employee_count)
 
     def get_employee(self, employee_id):
-        self.cursor.execute("SELECT id, name, position, hire_date FROM employees WHERE id = ?", (employee_id,))
-        return self.cursor.fetchone()
+        return self._cached(self.employee_cache, ("employee", employee_id), self._load_employee, employee_id)
+
+    def _load_employees(self, limit, after):
+        # Постраничная выборка по ключу: after - (name, id) последнего сотрудника предыдущей страницы
+        if after is None:
+            self.employee_cursor.execute(
+                "SELECT id, name, position, hire_date FROM employees ORDER BY name, id LIMIT ?",
+                (limit,)
+            )
+        else:
+            self.employee_cursor.execute(
+                "SELECT id, name, position, hire_date FROM employees WHERE (name, id) > (?, ?) "
+                "ORDER BY name, id LIMIT ?",
+                (after[0], after[1], limit)
+            )
+        return self.employee_cursor.fetchall()
+
+    def _load_employee_count(self):
+        self.cursor.execute("SELECT COUNT(*) FROM employees")
+        return self.cursor.fetchone()[0]
+
+    def _load_employee(self, employee_id):
+        self.employee_cursor.execute("SELECT id, name, position, hire_date FROM employees WHERE id = ?",
+                                     (employee_id,))
+        return self.employee_cursor.fetchone()
 
     def add_time_record(self, employee_id, date, arrival_time, departure_time):
-        self.cursor.execute(
-            "SELECT id FROM time_records WHERE employee_id = ? AND date = ?",
-            (employee_id, date)
+        self._check_open_period(self.get_archive_boundary(), date)
+        shift = self.get_schedule_index().resolve(employee_id, date)
+        self.cursor.execute(_UPSERT_TIME_RECORD, (employee_id, date, arrival_time, departure_time, *shift))
+        self.conn.commit()
+        self._invalidate_employee_stats(employee_id)
+
+    def add_time_records_bulk(self, records, chunk_size=None):
+        # records - итерируемое из (employee_id, date, arrival_time, departure_time).
+        # Без chunk_size всё пишется одной транзакцией, иначе коммит после каждых chunk_size строк.
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"Размер порции должен быть положительным: {chunk_size}")
+        index = self.get_schedule_index()
+        boundary = self.get_archive_boundary()
+        rows = (
+            (employee_id, date, arrival_time, departure_time, *index.resolve(employee_id, date))
+            for employee_id, date, arrival_time, departure_time in records
+            if self._check_open_period(boundary, date)
         )
-        record = self.cursor.fetchone()
+        total = 0
+
+        try:
+            # Порция не собирается в список: первая строка читается заранее, чтобы понять,
+            # остались ли ещё записи
+            rest = None if chunk_size is None else chunk_size - 1
+            for first in rows:
+                self.cursor.executemany(_UPSERT_TIME_RECORD, chain((first,), islice(rows, rest)))
+                total += self.cursor.rowcount
+                self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.stats_cache.invalidate()
+
+        return total
+
+    def record_arrival(self, employee_id, date, arrival_time):
+        self._check_open_period(self.get_archive_boundary(), date)
+        shift = self.get_schedule_index().resolve(employee_id, date)
+        self.cursor.execute(_RECORD_ARRIVAL, (employee_id, date, arrival_time, *shift))
+        self.conn.commit()
+        self._invalidate_employee_stats(employee_id)
 
-        if record:
-            self.cursor.execute(
-                "UPDATE time_records SET arrival_time = ?, departure_time = ? WHERE id = ?",
-                (arrival_time, departure_time, record[0])
+    def record_departure(self, employee_id, date, departure_time):
+        self._check_open_period(self.get_archive_boundary(), date)
+        shift = self.get_schedule_index().resolve(employee_id, date)
+        self.cursor.execute(_RECORD_DEPARTURE, (employee_id, date, departure_time, *shift))
+        self.conn.commit()
+        self._invalidate_employee_stats(employee_id)
+
+    def record_clock_events(self, events):
+        # events - список (employee_id, date, kind, minutes), kind - "in" или "out"; всё одной транзакцией.
+        # Отметки одного вида применяются по порядку, последняя за день побеждает.
+        index = self.get_schedule_index()
+        boundary = self.get_archive_boundary()
+        for _, date, _, _ in events:
+            self._check_open_period(boundary, date)
+
+        try:
+            for kind, statement in _CLOCK_STATEMENTS.items():
+                self.cursor.executemany(statement, (
+                    (employee_id, date, minutes, *index.resolve(employee_id, date))
+                    for employee_id, date, event_kind, minutes in events if event_kind == kind
+                ))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.stats_cache.invalidate()
+
+        return len(events)
+
+    @staticmethod
+    def _check_open_period(boundary, date):
+        # Архивные периоды закрыты: их суммы заморожены в archived_stats
+        if boundary is not None and date < boundary:
+            raise ValueError(f"Записи до {day_to_date(boundary):%d.%m.%Y} перенесены в архив и не изменяются")
+        return True
+
+    def get_on_site(self, date):
+        # Кто сейчас на месте: пришёл в этот день и ещё не ушёл. Читается по частичному индексу открытых записей
+        self.cursor.execute('''
+        SELECT e.id, e.name, e.position, r.arrival_time
+        FROM time_records r
+        JOIN employees e ON e.id = r.employee_id
+        WHERE r.date = ? AND r.departure_time IS NULL AND r.arrival_time IS NOT NULL
+        ORDER BY r.arrival_time, e.id''', (date,))
+        return self.cursor.fetchall()
+
+    def get_time_records(self, employee_id, limit=-1, before=None):
+        # before - дата последней записи предыдущей страницы
+        if before is None:
+            self.record_cursor.execute(
+                "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? "
+                "ORDER BY date DESC LIMIT ?",
+                (employee_id, limit)
             )
         else:
-            self.cursor.execute(
-                "INSERT INTO time_records (employee_id, date, arrival_time, departure_time) VALUES (?, ?, ?, ?)",
-                (employee_id, date, arrival_time, departure_time)
+            self.record_cursor.execute(
+                "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? AND date < ? "
+                "ORDER BY date DESC LIMIT ?",
+                (employee_id, before, limit)
             )
+        rows = self.record_cursor.fetchall()
+
+        # Архив читается, только когда активные записи сотрудника на этой странице закончились
+        if self.get_archive_boundary() is not None and (limit < 0 or len(rows) < limit):
+            self.record_cursor.execute(
+                "SELECT date, arrival_time, departure_time FROM time_records_archive "
+                "WHERE employee_id = ? AND date < ? ORDER BY date DESC LIMIT ?",
+                (employee_id, before if before is not None else self.get_archive_boundary(),
+                 limit - len(rows) if limit >= 0 else -1)
+            )
+            rows += self.record_cursor.fetchall()
+        return rows
 
-        self.conn.commit()
-
-    def get_time_records(self, employee_id):
-        self.cursor.execute(
-            "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? ORDER BY date DESC",
-            (employee_id,)
+    def get_time_record(self, employee_id, date):
+        # Только активные записи: архивные не меняются
+        self.record_cursor.execute(
+            "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ? AND date = ?",
+            (employee_id, date)
         )
-        return self.cursor.fetchall()
+        return self.record_cursor.fetchone()
+
+    def iter_employees(self, batch_size=1000):
+        # Все сотрудники по ФИО без загрузки списка целиком
+        cursor = self._model_cursor(Employee)
+        cursor.execute("SELECT id, name, position, hire_date FROM employees ORDER BY name, id")
+        yield from self._iter_batches(cursor, batch_size)
+
+    def iter_time_records(self, employee_id, date_from=None, date_to=None, batch_size=1000):
+        # История сотрудника по возрастанию даты, порциями по batch_size строк
+        range_sql, params = self._date_range(date_from, date_to)
+        for table in self._records_tables(date_from, date_to):
+            cursor = self._model_cursor(TimeRecord)
+            cursor.execute(
+                f"SELECT r.date, r.arrival_time, r.departure_time FROM {table} r "
+                f"WHERE r.employee_id = ?{range_sql} ORDER BY r.date",
+                (employee_id, *params)
+            )
+            yield from self._iter_batches(cursor, batch_size)
+
+    def iter_timesheet(self, date_from=None, date_to=None, employee_id=None, batch_size=1000):
+        # Потоковая выборка табеля: отдельный курсор и fetchmany, вся выборка в память не загружается.
+        # Порядок совпадает с индексом по дате, поэтому сортировка не нужна и память не растёт.
+        range_sql, params = self._date_range(date_from, date_to)
+        if employee_id is not None:
+            range_sql += " AND r.employee_id = ?"
+            params.append(employee_id)
+
+        for table in self._records_tables(date_from, date_to):
+            cursor = self.conn.cursor()
+            cursor.execute(f'''
+            SELECT e.name, e.position, r.date, {_SHIFT_START}, {_SHIFT_END}, r.arrival_time, r.departure_time,
+                   MAX(r.arrival_time - {_SHIFT_START}, 0), MAX(r.departure_time - {_SHIFT_END}, 0)
+            FROM {table} r
+            JOIN employees e ON e.id = r.employee_id
+            WHERE 1 = 1{range_sql}
+            ORDER BY r.date, r.employee_id''', params)
+            yield from self._iter_batches(cursor, batch_size)
+
+    def iter_lateness(self, date_from=None, date_to=None, batch_size=1000):
+        # Итоги по каждому сотруднику за период: дни, опоздания и суммы минут
+        range_sql, params = self._date_range(date_from, date_to)
+
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT e.name, e.position, {_STATS_SUMS}, SUM(r.arrival_time > {_SHIFT_START})
+        FROM {self._records_source(date_from, date_to)} r
+        JOIN employees e ON e.id = r.employee_id
+        WHERE {_VALID_RECORD}{range_sql}
+        GROUP BY r.employee_id
+        ORDER BY r.employee_id''', params)
+        yield from self._iter_batches(cursor, batch_size)
+
+    @staticmethod
+    def _iter_batches(cursor, batch_size):
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
 
     def get_work_settings(self):
+        return self._cached(self.settings_cache, None, self._load_work_settings)
+
+    def _load_work_settings(self):
         self.cursor.execute("SELECT start_time, end_time FROM work_settings WHERE id = 1")
         return self.cursor.fetchone()
 
     def update_work_settings(self, start_time, end_time):
-        self.cursor.execute("UPDATE work_settings SET start_time = ?, end_time = ? WHERE id = 1",
-                          (start_time, end_time))
+        # Настройки - смена записей без графика (пустая смена), сами записи не меняются:
+        # пересобираются только суммы в employee_stats
+        try:
+            self.cursor.execute("UPDATE work_settings SET start_time = ?, end_time = ? WHERE id = 1",
+                                (start_time, end_time))
+            self._rebuild_employee_stats()
+        except Exception:
+            self.conn.rollback()
+            raise
         self.conn.commit()
 
-    def get_employee_stats(self, employee_id):
-        work_settings = self.get_work_settings()
-        work_start = datetime.strptime(work_settings[0], "%H:%M").time()
-        work_end = datetime.strptime(work_settings[1], "%H:%M").time()
+        self.settings_cache.invalidate()
+        self.stats_cache.invalidate()
 
+    def get_schedule_index(self):
+        return self._cached(self.schedule_cache, None, self._load_schedule_index)
+
+    def _load_schedule_index(self):
+        # Дни без графика получают пустую смену: она считается по текущим work_settings
         self.cursor.execute(
-            "SELECT date, arrival_time, departure_time FROM time_records WHERE employee_id = ?",
-            (employee_id,)
+            "SELECT id, employee_id, position, date_from, date_to, start_time, end_time FROM schedules"
         )
-        records = self.cursor.fetchall()
+        schedules = self.cursor.fetchall()
+        self.cursor.execute("SELECT id, position FROM employees")
+        return ScheduleIndex((None, None), schedules, dict(self.cursor.fetchall()))
 
-        if not records:
-            return {
-                "avg_delay": "0:00",
-                "avg_overtime": "0:00",
-                "avg_workday": "0:00"
-            }
-
-        total_delay_minutes = 0
-        total_overtime_minutes = 0
-        total_workday_minutes = 0
-        count = 0
-
-        for record in records:
-            if not record[1] or not record[2]:
-                continue
-
-            arrival = datetime.strptime(record[1], "%H:%M").time()
-            departure = datetime.strptime(record[2], "%H:%M").time()
-
-            if arrival > work_start:
-                delay_minutes = (arrival.hour * 60 + arrival.minute) - (work_start.hour * 60 + work_start.minute)
-                total_delay_minutes += delay_minutes
-
-            if departure > work_end:
-                overtime_minutes = (departure.hour * 60 + departure.minute) - (work_end.hour * 60 + work_end.minute)
-                total_overtime_minutes += overtime_minutes
+    def get_schedules(self):
+        self.cursor.execute(
+            "SELECT id, employee_id, position, date_from, date_to, start_time, end_time FROM schedules ORDER BY id"
+        )
+        return self.cursor.fetchall()
 
-            workday_minutes = (departure.hour * 60 + departure.minute) - (arrival.hour * 60 + arrival.minute)
-            total_workday_minutes += workday_minutes
+    def add_schedule(self, start_time, end_time, employee_id=None, position=None, date_from=None, date_to=None):
+        # Без employee_id и position график действует на всю компанию; без дат - бессрочно
+        try:
+            self.cursor.execute(
+                "INSERT INTO schedules (employee_id, position, date_from, date_to, start_time, end_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (employee_id, position, date_from, date_to, start_time, end_time)
+            )
+            schedule_id = self.cursor.lastrowid
+            self._assign_shifts(employee_id, position, date_from, date_to)
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-            count += 1
+        self.schedule_cache.invalidate()
+        self.stats_cache.invalidate()
+        return schedule_id
+
+    def remove_schedule(self, schedule_id):
+        try:
+            self.cursor.execute("SELECT employee_id, position, date_from, date_to FROM schedules WHERE id = ?",
+                                (schedule_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return False
+            self.cursor.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+            self._assign_shifts(*row)
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-        if count == 0:
-            return {
-                "avg_delay": "0:00",
-                "avg_overtime": "0:00",
-                "avg_workday": "0:00"
-            }
+        self.schedule_cache.invalidate()
+        self.stats_cache.invalidate()
+        return True
+
+    def _assign_shifts(self, employee_id=None, position=None, date_from=None, date_to=None):
+        # Пересчёт смен в записях, на которые могло повлиять изменение графика: по одному UPDATE
+        # на интервал сводного графика сотрудника, без чтения самих записей. Вызывается внутри
+        # открытой транзакции: построчные триггеры на это время выключены, а суммы затронутых
+        # сотрудников в employee_stats собираются заново одним агрегирующим запросом.
+        if employee_id is not None:
+            scope, params = "employee_id = ?", (employee_id,)
+        elif position is not None:
+            scope, params = "employee_id IN (SELECT id FROM employees WHERE position = ?)", (position,)
+        else:
+            scope, params = "1 = 1", ()
+
+        index = self._load_schedule_index()
+        self._suspend_stats_triggers(True)
+        self.cursor.executemany(_ASSIGN_SHIFT, (
+            (start, end, affected_id, first, last, start, end)
+            for affected_id in index.employees_for(employee_id, position)
+            for first, last, (start, end) in index.timeline(affected_id).segments(date_from, date_to)
+        ))
+        self._suspend_stats_triggers(False)
+        self._rebuild_employee_stats(scope, params)
+
+    def _suspend_stats_triggers(self, suspended):
+        # Флаг меняется внутри открытой транзакции: другие соединения его не видят,
+        # а при откате триггеры снова включаются
+        self.cursor.execute("UPDATE stats_triggers SET suspended = ? WHERE id = 1", (int(suspended),))
+
+    def _rebuild_employee_stats(self, scope="1 = 1", params=()):
+        self.cursor.execute(f"DELETE FROM employee_stats WHERE {scope}", params)
+        self.cursor.execute(f'''
+        INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+        SELECT r.employee_id, {_STATS_SUMS}
+        FROM time_records r
+        WHERE {_VALID_RECORD} AND {scope}
+        GROUP BY r.employee_id''', params)
+
+    def get_archive_boundary(self):
+        # День, раньше которого записи перенесены в архив; None - архива нет
+        return self._cached(self.settings_cache, "archive", self._load_archive_boundary)
+
+    def _load_archive_boundary(self):
+        self.cursor.execute("SELECT archived_before FROM archive_settings WHERE id = 1")
+        return self.cursor.fetchone()[0]
+
+    def archive_before(self, day):
+        # Переносит закрытый период (записи раньше day) в time_records_archive и замораживает
+        # его суммы по сотрудникам и годам в archived_stats. Граница архива только сдвигается вперёд.
+        boundary = self.get_archive_boundary()
+        if boundary is not None and day <= boundary:
+            return 0
+
+        try:
+            self.cursor.execute(f'''
+            INSERT INTO archived_stats (employee_id, year, delay_minutes, overtime_minutes, workday_minutes, days)
+            SELECT r.employee_id, CAST(strftime('%Y', r.date * 86400, 'unixepoch') AS INTEGER) AS year, {_STATS_SUMS}
+            FROM time_records r
+            WHERE {_VALID_RECORD} AND r.date < ?
+            GROUP BY r.employee_id, year
+            ON CONFLICT (employee_id, year) DO UPDATE SET
+                delay_minutes = delay_minutes + excluded.delay_minutes,
+                overtime_minutes = overtime_minutes + excluded.overtime_minutes,
+                workday_minutes = workday_minutes + excluded.workday_minutes,
+                days = days + excluded.days''', (day,))
+
+            # В архив смена переносится явной: закрытый период не зависит от будущих настроек.
+            # id архив назначает сам: id удалённых записей SQLite отдаёт новым записям time_records
+            self.cursor.execute(f'''
+            INSERT INTO time_records_archive (employee_id, date, arrival_time, departure_time, shift_start, shift_end)
+            SELECT r.employee_id, r.date, r.arrival_time, r.departure_time, {_SHIFT_START}, {_SHIFT_END}
+            FROM time_records r
+            WHERE r.date < ?''', (day,))
+            moved = self.cursor.rowcount
+
+            # Переносится обычно большая часть истории: сводная таблица собирается заново,
+            # а не уменьшается построчным триггером
+            self._suspend_stats_triggers(True)
+            self.cursor.execute("DELETE FROM time_records WHERE date < ?", (day,))
+            self._suspend_stats_triggers(False)
+            self._rebuild_employee_stats()
+
+            self.cursor.execute("UPDATE archive_settings SET archived_before = ? WHERE id = 1", (day,))
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-        avg_delay = total_delay_minutes / count
-        avg_overtime = total_overtime_minutes / count
-        avg_workday = total_workday_minutes / count
+        self.settings_cache.invalidate()
+        self.stats_cache.invalidate()
+        return moved
+
+    def _stats_source(self):
+        # Суммы за всё время по всем сотрудникам; без архива они целиком лежат в employee_stats
+        return "employee_stats" if self.get_archive_boundary() is None else _TOTAL_STATS
+
+    def _records_tables(self, date_from, date_to):
+        # Таблицы с записями периода в порядке дат: все даты архива раньше активных записей.
+        # Горячие запросы читают только time_records; архив подключается, когда период его захватывает
+        boundary = self.get_archive_boundary()
+        if boundary is None or (date_from is not None and date_from >= boundary):
+            return ("time_records",)
+        if date_to is not None and date_to < boundary:
+            return ("time_records_archive",)
+        return ("time_records_archive", "time_records")
+
+    def _records_source(self, date_from, date_to):
+        tables = self._records_tables(date_from, date_to)
+        return tables[0] if len(tables) == 1 else _ALL_RECORDS
+
+    def get_employee_stats(self, employee_id, date_from=None, date_to=None):
+        return self._cached(self.stats_cache, ("employee", employee_id, date_from, date_to),
+                            self._load_employee_stats, employee_id, date_from, date_to)
+
+    def get_all_stats(self, date_from=None, date_to=None):
+        return self._cached(self.stats_cache, ("all", date_from, date_to), self._load_all_stats, date_from, date_to)
+
+    def get_company_stats(self, date_from=None, date_to=None):
+        return self.get_all_stats(date_from, date_to)["company"]
+
+    def get_period_stats(self, group_by, date_from=None, date_to=None):
+        return self._cached(self.stats_cache, ("period", group_by, date_from, date_to),
+                            self._load_period_stats, group_by, date_from, date_to)
+
+    def _load_employee_stats(self, employee_id, date_from, date_to):
+        if date_from is None and date_to is None:
+            if self.get_archive_boundary() is None:
+                self.cursor.execute(
+                    "SELECT delay_minutes, overtime_minutes, workday_minutes, days FROM employee_stats "
+                    "WHERE employee_id = ?",
+                    (employee_id,)
+                )
+            else:
+                # Условие по сотруднику внутри каждой части, чтобы обе читались по первичному ключу
+                self.cursor.execute('''
+                SELECT SUM(delay_minutes), SUM(overtime_minutes), SUM(workday_minutes), SUM(days) FROM (
+                    SELECT delay_minutes, overtime_minutes, workday_minutes, days
+                    FROM employee_stats WHERE employee_id = ?
+                    UNION ALL
+                    SELECT delay_minutes, overtime_minutes, workday_minutes, days
+                    FROM archived_stats WHERE employee_id = ?
+                )''', (employee_id, employee_id))
+            row = self.cursor.fetchone()
+            if not row or row[3] is None:
+                return self.format_stats(0, 0, 0, 0)
+            return self.format_stats(*row)
+
+        # За период считаем по индексу (employee_id, date) только записи внутри диапазона
+        range_sql, range_params = self._date_range(date_from, date_to)
+        self.cursor.execute(
+            f"SELECT {_STATS_SUMS} FROM {self._records_source(date_from, date_to)} r "
+            f"WHERE r.employee_id = ? AND {_VALID_RECORD}{range_sql}",
+            (employee_id, *range_params)
+        )
+        return self.format_stats(*self.cursor.fetchone())
+
+    def _load_all_stats(self, date_from, date_to):
+        if date_from is None and date_to is None:
+            # Суммы по сотрудникам берутся из employee_stats, которую поддерживают триггеры
+            self.cursor.execute(f'''
+            SELECT e.id,
+                   COALESCE(s.delay_minutes, 0),
+                   COALESCE(s.overtime_minutes, 0),
+                   COALESCE(s.workday_minutes, 0),
+                   COALESCE(s.days, 0)
+            FROM employees e
+            LEFT JOIN {self._stats_source()} s ON s.employee_id = e.id''')
+        else:
+            range_sql, range_params = self._date_range(date_from, date_to)
+            self.cursor.execute(f'''
+            SELECT e.id,
+                   COALESCE(s.delay_minutes, 0),
+                   COALESCE(s.overtime_minutes, 0),
+                   COALESCE(s.workday_minutes, 0),
+                   COALESCE(s.days, 0)
+            FROM employees e
+            LEFT JOIN (
+                SELECT r.employee_id, {_STATS_SUMS}
+                FROM {self._records_source(date_from, date_to)} r
+                WHERE {_VALID_RECORD}{range_sql}
+                GROUP BY r.employee_id
+            ) s ON s.employee_id = e.id''', range_params)
+
+        return self.summarize_stats(self.cursor.fetchall())
+
+    @staticmethod
+    def summarize_stats(rows):
+        # rows - (employee_id, сумма опозданий, сумма переработок, сумма длительности дня, число дней)
+        employees = {}
+        total_delay = 0
+        total_overtime = 0
+        total_workday = 0
+
+        for employee_id, delay, overtime, workday, count in rows:
+            stats = Database.format_stats(delay, overtime, workday, count)
+            employees[employee_id] = stats
+
+            # Компания считается как среднее от уже округлённых средних по сотрудникам
+            total_delay += time_to_minutes(stats["avg_delay"])
+            total_overtime += time_to_minutes(stats["avg_overtime"])
+            total_workday += time_to_minutes(stats["avg_workday"])
+
+        if not employees:
+            company = Database.format_stats(0, 0, 0, 0)
+        else:
+            company = Database.format_stats(total_delay, total_overtime, total_workday, len(employees))
 
         return {
-            "avg_delay": f"{int(avg_delay // 60)}:{int(avg_delay % 60):02d}",
-            "avg_overtime": f"{int(avg_overtime // 60)}:{int(avg_overtime % 60):02d}",
-            "avg_workday": f"{int(avg_workday // 60)}:{int(avg_workday % 60):02d}"
+            "company": company,
+            "employees": employees
         }
 
-    def get_company_stats(self):
-        all_employees = self.get_all_employees()
-
-        if not all_employees:
+    def _load_period_stats(self, group_by, date_from, date_to):
+        # Средние по всем полным рабочим дням внутри каждой группы (недели, месяца или должности)
+        bucket = _PERIOD_BUCKETS[group_by]
+        range_sql, range_params = self._date_range(date_from, date_to)
+        self.cursor.execute(f'''
+        SELECT {bucket} AS period, COUNT(DISTINCT r.employee_id), {_STATS_SUMS}
+        FROM {self._records_source(date_from, date_to)} r
+        JOIN employees e ON e.id = r.employee_id
+        WHERE {_VALID_RECORD}{range_sql}
+        GROUP BY period
+        ORDER BY period''', range_params)
+
+        periods = []
+        for period, employees, delay, overtime, workday, count in self.cursor.fetchall():
+            stats = self.format_stats(delay, overtime, workday, count)
+            stats.update(period=period, employees=employees, days=count)
+            periods.append(stats)
+        return periods
+
+    @staticmethod
+    def _date_range(date_from, date_to):
+        conditions = ""
+        params = []
+        if date_from is not None:
+            conditions += " AND r.date >= ?"
+            params.append(date_from)
+        if date_to is not None:
+            conditions += " AND r.date <= ?"
+            params.append(date_to)
+        return conditions, params
+
+    @staticmethod
+    def format_stats(total_delay, total_overtime, total_workday, count):
+        if count == 0:
             return {
                 "avg_delay": "0:00",
                 "avg_overtime": "0:00",
                 "avg_workday": "0:00"
             }
 
-        total_delay_hours = 0
-        total_delay_minutes = 0
-        total_overtime_hours = 0
-        total_overtime_minutes = 0
-        total_workday_hours = 0
-        total_workday_minutes = 0
-
-        for employee in all_employees:
-            stats = self.get_employee_stats(employee[0])
-
-            delay_parts = stats["avg_delay"].split(":")
-            overtime_parts = stats["avg_overtime"].split(":")
-            workday_parts = stats["avg_workday"].split(":")
-
-            total_delay_hours += int(delay_parts[0])
-            total_delay_minutes += int(delay_parts[1])
-            total_overtime_hours += int(overtime_parts[0])
-            total_overtime_minutes += int(overtime_parts[1])
-            total_workday_hours += int(workday_parts[0])
-            total_workday_minutes += int(workday_parts[1])
-
-        total_delay = total_delay_hours * 60 + total_delay_minutes
-        total_overtime = total_overtime_hours * 60 + total_overtime_minutes
-        total_workday = total_workday_hours * 60 + total_workday_minutes
-
-        count = len(all_employees)
         avg_delay = total_delay / count
         avg_overtime = total_overtime / count
         avg_workday = total_workday / count
@@ -0,0 +1,148 @@
+# Поиск сотрудников по ФИО и должности в памяти. Слова хранятся в отсортированном словаре,
+# поэтому слова с заданным началом находятся двоичным поиском; триграммы слов дают совпадения
+# с опечатками и внутри слова. Индекс обновляется точечно при добавлении и удалении сотрудника.
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+_WORD = re.compile(r"\w+")
+
+# Вес совпадения: слово целиком, начало слова, похожее слово (умножается на долю общих триграмм)
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+# Совпадение в должности весит вдвое меньше, чем в ФИО
+POSITION_WEIGHT = 0.5
+# Похожими считаются слова, у которых доля общих триграмм не меньше порога
+MIN_SIMILARITY = 0.3
+MIN_FUZZY_LENGTH = 3
+
+
+def normalize(text):
+    return text.casefold().replace("ё", "е")
+
+
+def split_words(text):
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EmployeeSearchIndex:
+    def __init__(self, employees=()):
+        self._employees = {}
+        # слово -> {id сотрудника: вес поля}
+        self._postings = {}
+        self._vocabulary = []
+        # триграмма -> слова словаря; слово -> число его триграмм
+        self._trigrams = {}
+        self._trigram_counts = {}
+
+        # При построении словарь сортируется один раз, а не вставкой каждого нового слова
+        for employee in employees:
+            self._employees[employee.id] = employee
+            self._add_postings(employee)
+        self._vocabulary = sorted(self._postings)
+        for word in self._vocabulary:
+            self._add_trigrams(word)
+
+    def __len__(self):
+        return len(self._employees)
+
+    def add(self, employee):
+        self.remove(employee.id)
+        self._employees[employee.id] = employee
+        for word in self._add_postings(employee):
+            insort(self._vocabulary, word)
+            self._add_trigrams(word)
+
+    def _add_postings(self, employee):
+        # Возвращает слова, которых до этого не было в словаре
+        new_words = []
+        weights = {}
+        for word in split_words(employee.position):
+            weights[word] = POSITION_WEIGHT
+        for word in split_words(employee.name):
+            weights[word] = 1.0
+        for word, weight in weights.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                new_words.append(word)
+            postings[employee.id] = weight
+        return new_words
+
+    def remove(self, employee_id):
+        employee = self._employees.pop(employee_id, None)
+        if employee is None:
+            return
+        for word in set(split_words(employee.name) + split_words(employee.position)):
+            postings = self._postings[word]
+            del postings[employee_id]
+            if not postings:
+                del self._postings[word]
+                self._remove_word(word)
+
+    def _add_trigrams(self, word):
+        grams = trigrams(word)
+        self._trigram_counts[word] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(word)
+
+    def _remove_word(self, word):
+        del self._vocabulary[bisect_left(self._vocabulary, word)]
+        del self._trigram_counts[word]
+        for gram in trigrams(word):
+            words = self._trigrams[gram]
+            words.discard(word)
+            if not words:
+                del self._trigrams[gram]
+
+    def search(self, query, limit=20):
+        # Сотрудник должен совпасть с каждым словом запроса; очки по словам складываются
+        scores = None
+        for word in split_words(query):
+            matches = self._match(word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {employee_id: score + matches[employee_id]
+                          for employee_id, score in scores.items() if employee_id in matches}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+
+        ranked = heapq.nsmallest(limit, scores.items(),
+                                 key=lambda item: (-item[1], self._employees[item[0]].name, item[0]))
+        return [self._employees[employee_id] for employee_id, _ in ranked]
+
+    def _match(self, word):
+        # {id сотрудника: лучший счёт среди слов словаря, совпавших с word}
+        scores = {}
+
+        def collect(vocabulary_word, score):
+            for employee_id, weight in self._postings[vocabulary_word].items():
+                if score * weight > scores.get(employee_id, 0):
+                    scores[employee_id] = score * weight
+
+        index = bisect_left(self._vocabulary, word)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(word):
+            vocabulary_word = self._vocabulary[index]
+            collect(vocabulary_word, EXACT_SCORE if vocabulary_word == word else PREFIX_SCORE)
+            index += 1
+
+        if len(word) >= MIN_FUZZY_LENGTH:
+            grams = trigrams(word)
+            common = Counter()
+            for gram in grams:
+                common.update(self._trigrams.get(gram, ()))
+            for vocabulary_word, count in common.items():
+                similarity = count / (len(grams) + self._trigram_counts[vocabulary_word] - count)
+                if similarity >= MIN_SIMILARITY:
+                    collect(vocabulary_word, FUZZY_SCORE * similarity)
+        return scores
@@ -0,0 +1,112 @@
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime
+from database import Database
+from models import date_to_day, day_to_date, minutes_to_time
+
+TIMESHEET_HEADER = (
+    "ФИО", "Должность", "Дата", "Смена", "Время прихода", "Время ухода", "Опоздание, мин", "Переработка, мин"
+)
+LATENESS_HEADER = (
+    "ФИО", "Должность", "Рабочих дней", "Дней с опозданием", "Опоздания, мин", "Переработка, мин",
+    "Среднее опоздание", "Средняя переработка", "Средняя длительность рабочего дня"
+)
+
+
+def timesheet_rows(database, date_from=None, date_to=None, employee_id=None):
+    for name, position, day, shift_start, shift_end, arrival, departure, delay, overtime in database.iter_timesheet(
+            date_from, date_to, employee_id):
+        yield (name, position, day_to_date(day).strftime("%d.%m.%Y"),
+               f"{minutes_to_time(shift_start)}-{minutes_to_time(shift_end)}",
+               minutes_to_time(arrival), minutes_to_time(departure), delay, overtime)
+
+
+def lateness_rows(database, date_from=None, date_to=None):
+    for name, position, delay, overtime, workday, days, late_days in database.iter_lateness(date_from, date_to):
+        stats = Database.format_stats(delay, overtime, workday, days)
+        yield (name, position, days, late_days, delay, overtime,
+               stats["avg_delay"], stats["avg_overtime"], stats["avg_workday"])
+
+
+REPORTS = {
+    "timesheet": (TIMESHEET_HEADER, timesheet_rows),
+    "lateness": (LATENESS_HEADER, lateness_rows),
+}
+
+
+def write_csv(path, header, rows):
+    count = 0
+    # utf-8-sig, чтобы Excel правильно показал кириллицу
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_xlsx(path, header, rows):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Для экспорта в XLSX установите openpyxl: pip install openpyxl")
+
+    # В режиме write_only строки сразу сбрасываются на диск и не хранятся в памяти
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+
+    workbook.save(path)
+    return count
+
+
+def export_report(database, report, path, date_from=None, date_to=None, **options):
+    header, make_rows = REPORTS[report]
+    rows = make_rows(database, date_from, date_to, **options)
+    if os.path.splitext(path)[1].lower() == ".xlsx":
+        return write_xlsx(path, header, rows)
+    return write_csv(path, header, rows)
+
+
+def parse_day(value):
+    return date_to_day(datetime.strptime(value, "%Y-%m-%d").date())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка табеля и отчёта по опозданиям в CSV или XLSX")
+    parser.add_argument("report", choices=sorted(REPORTS), help="timesheet - табель по дням, lateness - итоги по сотрудникам")
+    parser.add_argument("path", help="файл .csv или .xlsx")
+    parser.add_argument("--db", default="employee_time_tracking.db", help="путь к базе данных")
+    parser.add_argument("--from", dest="date_from", type=parse_day, help="начало периода, YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", type=parse_day, help="конец периода, YYYY-MM-DD")
+    parser.add_argument("--employee", type=int, help="только один сотрудник (для табеля)")
+    args = parser.parse_args()
+
+    options = {}
+    if args.employee is not None:
+        if args.report != "timesheet":
+            parser.error("--employee поддерживается только для табеля")
+        options["employee_id"] = args.employee
+
+    db = Database(args.db)
+    try:
+        count = export_report(db, args.report, args.path, args.date_from, args.date_to, **options)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"Выгружено строк: {count}")
+
+
+if __name__ == "__main__":
+    main()
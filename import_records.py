@@ -0,0 +1,84 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from database import DEFAULT_PROFILE, PROFILES, Database
+from models import date_to_day
+
+FIELDS = ("employee_id", "date", "arrival_time", "departure_time")
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        # .jsonl читается построчно, обычный .json - массив объектов
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def parse_time(value):
+    if not value:
+        return None
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"ожидается положительное число: {value}")
+    return number
+
+
+def to_rows(items):
+    for line, item in enumerate(items, start=1):
+        try:
+            yield (
+                int(item["employee_id"]),
+                date_to_day(datetime.strptime(item["date"], "%Y-%m-%d").date()),
+                parse_time(item.get("arrival_time")),
+                parse_time(item.get("departure_time")),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Запись {line}: некорректные данные ({e})") from e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт записей учёта времени из CSV/JSON без запуска интерфейса")
+    parser.add_argument("path", help="файл .csv, .json или .jsonl с полями " + ", ".join(FIELDS))
+    parser.add_argument("--db", default="employee_time_tracking.db", help="путь к базе данных")
+    parser.add_argument("--format", choices=("csv", "json"), help="формат файла (по умолчанию по расширению)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help="профиль настроек соединения SQLite")
+    parser.add_argument("--chunk-size", type=positive_int, default=None,
+                        help="коммитить каждые N записей (по умолчанию одна транзакция)")
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if os.path.splitext(args.path)[1].lower() == ".csv" else "json")
+    items = read_csv(args.path) if file_format == "csv" else read_json(args.path)
+
+    db = Database(args.db, args.profile)
+    try:
+        count = db.add_time_records_bulk(to_rows(items), chunk_size=args.chunk_size)
+    except (ValueError, sqlite3.IntegrityError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"Импортировано записей: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# Инструментирование: число вызовов, время (с гистограммой) и число строк для каждого метода
+# Database, обработчиков MainWindow и каждого SQL-запроса. Включается явно через enable()
+# (в main.py - флаг --instrument или переменная окружения); выключенное ничего не подменяет
+# и ничего не стоит.
+import atexit
+import functools
+import inspect
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from database import Database
+
+ENV_VAR = "TIME_TRACKING_INSTRUMENT"
+
+# Верхние границы корзин гистограммы, мс; последняя корзина - всё, что дольше
+BUCKETS_MS = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000)
+
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+class Metric:
+    __slots__ = ("calls", "total", "max", "rows", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed, rows):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.rows += rows
+        self.histogram[bisect_left(BUCKETS_MS, elapsed * 1000)] += 1
+
+
+class Recorder:
+    # Database используется и из потока запросов, поэтому запись под блокировкой
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed, rows=0):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric()
+            metric.add(elapsed, rows)
+
+    def reset(self):
+        with self._lock:
+            self.metrics = {}
+
+    def report(self):
+        with self._lock:
+            items = sorted(self.metrics.items(), key=lambda item: item[1].total, reverse=True)
+
+        bounds = [f"<{bound:g}" for bound in BUCKETS_MS] + [f">={BUCKETS_MS[-1]:g}"]
+        lines = [
+            f"{'вызовов':>8} {'всего, мс':>10} {'сред., мс':>10} {'макс., мс':>10} {'строк':>9}  имя",
+            f"{'':>53}  гистограмма, мс: " + " ".join(bounds),
+        ]
+        for name, metric in items:
+            lines.append(
+                f"{metric.calls:>8} {metric.total * 1000:>10.1f} {metric.total * 1000 / metric.calls:>10.3f} "
+                f"{metric.max * 1000:>10.3f} {metric.rows:>9}  {name}"
+            )
+            lines.append(f"{'':>53}  " + " ".join(
+                f"{count:>{len(bound)}}" for count, bound in zip(metric.histogram, bounds)
+            ))
+        return "\n".join(lines)
+
+
+recorder = Recorder()
+
+# Подменённые методы: (класс, имя) -> исходная функция, для disable()
+_originals = {}
+_exit_registered = False
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def _count_rows(result):
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def _finish_sql(instance):
+    tracer = getattr(instance, "_sql_tracer", None)
+    if tracer is not None:
+        tracer.finish()
+
+
+def _positional_limit(func):
+    parameters = inspect.signature(func).parameters.values()
+    if any(parameter.kind is parameter.VAR_POSITIONAL for parameter in parameters):
+        return None
+    return sum(parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+               for parameter in parameters)
+
+
+def _wrap(name, func, slot=False):
+    # Qt сам отбрасывает лишние аргументы сигнала по сигнатуре слота (currentIndexChanged(int)
+    # -> refresh_statistics(self)); у обёртки сигнатура *args, поэтому для слотов это делается здесь
+    limit = _positional_limit(func) if slot else None
+
+    if inspect.isgeneratorfunction(func):
+        # Для итераторов время считается от создания до исчерпания, включая обработку строк вызывающим
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            rows = 0
+            try:
+                for item in func(*args, **kwargs):
+                    rows += 1
+                    yield item
+            finally:
+                _finish_sql(args[0])
+                recorder.record(name, time.perf_counter() - started, rows)
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if limit is not None:
+            args = args[:limit]
+        started = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            _finish_sql(args[0])
+            recorder.record(name, time.perf_counter() - started, _count_rows(result))
+    return wrapper
+
+
+def instrument(cls, prefixes=None):
+    # Оборачивает обычные методы класса (без staticmethod и служебных __*__, кроме __init__);
+    # prefixes - только методы с такими префиксами
+    slot = hasattr(cls, "staticMetaObject")
+    for name, value in list(vars(cls).items()):
+        if not inspect.isfunction(value) or (cls, name) in _originals:
+            continue
+        if name.startswith("__") and name != "__init__":
+            continue
+        if prefixes is not None and not name.startswith(prefixes):
+            continue
+        _originals[(cls, name)] = value
+        setattr(cls, name, _wrap(f"{cls.__name__}.{name}", value, slot))
+
+
+class SqlTracer:
+    # set_trace_callback сообщает только о начале выполнения запроса, поэтому запрос считается
+    # завершённым при начале следующего или при выходе из метода Database
+    def __init__(self):
+        self.sql = None
+        self.started = 0.0
+
+    def __call__(self, statement):
+        self.finish()
+        # Литералы заменяются на ?, чтобы одинаковые запросы с разными параметрами попали в одну строку
+        self.sql = "SQL " + _SPACES.sub(" ", _SQL_LITERALS.sub("?", statement)).strip()
+        self.started = time.perf_counter()
+
+    def finish(self):
+        if self.sql is not None:
+            recorder.record(self.sql, time.perf_counter() - self.started)
+            self.sql = None
+
+
+def _trace_sql(init):
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self._sql_tracer = SqlTracer()
+        self.conn.set_trace_callback(self._sql_tracer)
+    return wrapper
+
+
+def enable(sql=True, at_exit=True):
+    # Действует на соединения Database, открытые после вызова
+    global _exit_registered
+    if (Database, "__init__") in _originals:
+        return
+    instrument(Database)
+    if sql:
+        Database.__init__ = _trace_sql(Database.__init__)
+    if at_exit and not _exit_registered:
+        atexit.register(dump)
+        _exit_registered = True
+
+
+def disable():
+    for (cls, name), func in _originals.items():
+        setattr(cls, name, func)
+    _originals.clear()
+
+
+def dump(file=None):
+    if not recorder.metrics:
+        return
+    print(recorder.report(), file=file or sys.stderr)
@@ -1,16 +1,31 @@
+import os
 import sys
+from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import QApplication
+import instrumentation
 from database import Database
+from query_worker import QueryWorker
 from ui import MainWindow
 
 def main():
+    # Замеры вызовов базы и обновлений интерфейса: python main.py --instrument
+    # или TIME_TRACKING_INSTRUMENT=1; сводка печатается при выходе и по Ctrl+Shift+I
+    instrument = "--instrument" in sys.argv or bool(os.environ.get(instrumentation.ENV_VAR))
+    if instrument:
+        instrumentation.enable()
+        instrumentation.instrument(MainWindow, prefixes=("refresh_", "update_", "show_"))
+
     app = QApplication(sys.argv)
     db = Database()
+    query_worker = QueryWorker(db.db_name)
 
-    window = MainWindow(db)
+    window = MainWindow(db, query_worker)
+    if instrument:
+        QShortcut(QKeySequence("Ctrl+Shift+I"), window, instrumentation.dump)
     window.show()
 
     exit_code = app.exec()
+    query_worker.stop()
     db.close()
     sys.exit(exit_code)
 
@@ -0,0 +1,74 @@
+import argparse
+import sqlite3
+import sys
+from datetime import datetime
+from database import Database
+from models import date_to_day, day_to_date, minutes_to_time, time_to_minutes
+
+
+def parse_date(value):
+    return date_to_day(datetime.strptime(value, "%Y-%m-%d").date())
+
+
+def parse_time(value):
+    datetime.strptime(value, "%H:%M")
+    return time_to_minutes(value)
+
+
+def format_day(day):
+    return "..." if day is None else day_to_date(day).strftime("%d.%m.%Y")
+
+
+def print_schedules(db):
+    for schedule_id, employee_id, position, date_from, date_to, start_time, end_time in db.get_schedules():
+        if employee_id is not None:
+            scope = f"сотрудник {employee_id}"
+        elif position is not None:
+            scope = f"должность {position}"
+        else:
+            scope = "все сотрудники"
+        print(f"{schedule_id}\t{minutes_to_time(start_time)}-{minutes_to_time(end_time)}\t"
+              f"{format_day(date_from)} - {format_day(date_to)}\t{scope}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Графики смен сотрудников, должностей и всей компании")
+    parser.add_argument("--db", default="employee_time_tracking.db", help="путь к базе данных")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="показать графики")
+
+    add = commands.add_parser("add", help="добавить график")
+    add.add_argument("--start", type=parse_time, required=True, help="начало смены, ЧЧ:ММ")
+    add.add_argument("--end", type=parse_time, required=True, help="окончание смены, ЧЧ:ММ")
+    scope = add.add_mutually_exclusive_group()
+    scope.add_argument("--employee", type=int, help="id сотрудника")
+    scope.add_argument("--position", help="должность")
+    add.add_argument("--from", dest="date_from", type=parse_date, help="действует с даты ГГГГ-ММ-ДД")
+    add.add_argument("--to", dest="date_to", type=parse_date, help="действует по дату ГГГГ-ММ-ДД включительно")
+
+    remove = commands.add_parser("remove", help="удалить график")
+    remove.add_argument("schedule_id", type=int)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.command == "add":
+            schedule_id = db.add_schedule(args.start, args.end, args.employee, args.position,
+                                          args.date_from, args.date_to)
+            print(f"Добавлен график {schedule_id}")
+        elif args.command == "remove":
+            if not db.remove_schedule(args.schedule_id):
+                print(f"График {args.schedule_id} не найден", file=sys.stderr)
+                sys.exit(1)
+        else:
+            print_schedules(db)
+    except sqlite3.IntegrityError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+# Версионные миграции схемы. Номер применённой миграции хранится в PRAGMA user_version,
+# новые миграции добавляются только в конец списка MIGRATIONS.
+
+
+def _create_initial_schema(cursor):
+    # Таблица настроек рабочего времени
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS work_settings (
+        id INTEGER PRIMARY KEY,
+        start_time TEXT,
+        end_time TEXT
+    )''')
+
+    cursor.execute("SELECT COUNT(*) FROM work_settings")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("INSERT INTO work_settings (start_time, end_time) VALUES (?, ?)",
+                       ("09:00", "18:00"))
+
+    # Таблица сотрудников
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS employees (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        position TEXT NOT NULL,
+        hire_date TEXT NOT NULL
+    )''')
+
+    # Таблица учета рабочего времени
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS time_records (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER,
+        date TEXT,
+        arrival_time TEXT,
+        departure_time TEXT,
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )''')
+
+
+def _add_time_record_indexes(cursor):
+    # Дубликаты (employee_id, date) оставляем только в той строке, которую обновлял бы add_time_record
+    cursor.execute('''
+    DELETE FROM time_records
+    WHERE id NOT IN (SELECT MIN(id) FROM time_records GROUP BY employee_id, date)''')
+
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_time_records_employee_date
+    ON time_records (employee_id, date)''')
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_name ON employees (name)")
+
+
+def _text_to_minutes_sql(column):
+    return (f"CASE WHEN {column} IS NULL OR {column} = '' THEN NULL"
+            f" ELSE CAST(substr({column}, 1, instr({column}, ':') - 1) AS INTEGER) * 60"
+            f" + CAST(substr({column}, instr({column}, ':') + 1) AS INTEGER) END")
+
+
+def _store_times_as_integers(cursor):
+    # Время - минуты от полуночи, дата записи - дни от 1970-01-01. Типы колонок в SQLite
+    # не меняются через ALTER TABLE, поэтому таблицы пересоздаются.
+    cursor.execute('''
+    CREATE TABLE work_settings_new (
+        id INTEGER PRIMARY KEY,
+        start_time INTEGER,
+        end_time INTEGER
+    )''')
+    cursor.execute(f'''
+    INSERT INTO work_settings_new (id, start_time, end_time)
+    SELECT id, {_text_to_minutes_sql("start_time")}, {_text_to_minutes_sql("end_time")}
+    FROM work_settings''')
+    cursor.execute("DROP TABLE work_settings")
+    cursor.execute("ALTER TABLE work_settings_new RENAME TO work_settings")
+
+    cursor.execute('''
+    CREATE TABLE time_records_new (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER,
+        date INTEGER,
+        arrival_time INTEGER,
+        departure_time INTEGER,
+        FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+    )''')
+    cursor.execute(f'''
+    INSERT INTO time_records_new (id, employee_id, date, arrival_time, departure_time)
+    SELECT id, employee_id, CAST(strftime('%s', date) AS INTEGER) / 86400,
+           {_text_to_minutes_sql("arrival_time")}, {_text_to_minutes_sql("departure_time")}
+    FROM time_records''')
+    cursor.execute("DROP TABLE time_records")
+    cursor.execute("ALTER TABLE time_records_new RENAME TO time_records")
+
+    cursor.execute('''
+    CREATE UNIQUE INDEX idx_time_records_employee_date
+    ON time_records (employee_id, date)''')
+
+
+def _add_employee_stats_summary(cursor):
+    # Накопленные суммы по каждому сотруднику поддерживаются триггерами в той же транзакции,
+    # что и изменение time_records, поэтому чтение статистики не сканирует историю
+    cursor.execute('''
+    CREATE TABLE employee_stats (
+        employee_id INTEGER PRIMARY KEY,
+        delay_minutes INTEGER NOT NULL DEFAULT 0,
+        overtime_minutes INTEGER NOT NULL DEFAULT 0,
+        workday_minutes INTEGER NOT NULL DEFAULT 0,
+        days INTEGER NOT NULL DEFAULT 0
+    )''')
+
+    cursor.execute('''
+    INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+    SELECT r.employee_id,
+           SUM(MAX(r.arrival_time - s.start_time, 0)),
+           SUM(MAX(r.departure_time - s.end_time, 0)),
+           SUM(r.departure_time - r.arrival_time),
+           COUNT(*)
+    FROM time_records r, work_settings s
+    WHERE s.id = 1 AND r.arrival_time IS NOT NULL AND r.departure_time IS NOT NULL
+    GROUP BY r.employee_id''')
+
+    add_new = '''
+        INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+        SELECT NEW.employee_id,
+               MAX(NEW.arrival_time - s.start_time, 0),
+               MAX(NEW.departure_time - s.end_time, 0),
+               NEW.departure_time - NEW.arrival_time,
+               1
+        FROM work_settings s
+        WHERE s.id = 1 AND NEW.arrival_time IS NOT NULL AND NEW.departure_time IS NOT NULL
+        ON CONFLICT (employee_id) DO UPDATE SET
+            delay_minutes = delay_minutes + excluded.delay_minutes,
+            overtime_minutes = overtime_minutes + excluded.overtime_minutes,
+            workday_minutes = workday_minutes + excluded.workday_minutes,
+            days = days + 1;'''
+
+    subtract_old = '''
+        UPDATE employee_stats SET
+            delay_minutes = delay_minutes - (SELECT MAX(OLD.arrival_time - start_time, 0) FROM work_settings WHERE id = 1),
+            overtime_minutes = overtime_minutes - (SELECT MAX(OLD.departure_time - end_time, 0) FROM work_settings WHERE id = 1),
+            workday_minutes = workday_minutes - (OLD.departure_time - OLD.arrival_time),
+            days = days - 1
+        WHERE employee_id = OLD.employee_id AND OLD.arrival_time IS NOT NULL AND OLD.departure_time IS NOT NULL;'''
+
+    cursor.execute(f"CREATE TRIGGER time_records_stats_insert AFTER INSERT ON time_records BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER time_records_stats_delete AFTER DELETE ON time_records BEGIN {subtract_old} END")
+    cursor.execute(f'''
+    CREATE TRIGGER time_records_stats_update
+    AFTER UPDATE OF employee_id, arrival_time, departure_time ON time_records
+    BEGIN {subtract_old} {add_new} END''')
+
+    cursor.execute('''
+    CREATE TRIGGER employees_stats_delete AFTER DELETE ON employees
+    BEGIN
+        DELETE FROM employee_stats WHERE employee_id = OLD.id;
+    END''')
+
+
+def _remove_orphan_time_records(cursor):
+    # Пока внешние ключи были выключены, удаление сотрудника оставляло его записи
+    cursor.execute('''
+    DELETE FROM time_records
+    WHERE employee_id IS NULL OR employee_id NOT IN (SELECT id FROM employees)''')
+    cursor.execute("DELETE FROM employee_stats WHERE employee_id NOT IN (SELECT id FROM employees)")
+
+
+def _add_time_records_date_index(cursor):
+    # Покрывающий индекс для статистики по всей компании за период
+    cursor.execute('''
+    CREATE INDEX idx_time_records_date
+    ON time_records (date, employee_id, arrival_time, departure_time)''')
+
+
+def _add_open_records_index(cursor):
+    # Частичный индекс только по незакрытым записям: запрос "кто на месте" не сканирует историю
+    cursor.execute('''
+    CREATE INDEX idx_time_records_open
+    ON time_records (date, arrival_time, employee_id)
+    WHERE departure_time IS NULL AND arrival_time IS NOT NULL''')
+
+
+def _add_work_schedules(cursor):
+    # Графики смен с периодом действия: для сотрудника, должности или всей компании (оба поля пустые)
+    cursor.execute('''
+    CREATE TABLE schedules (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER REFERENCES employees (id) ON DELETE CASCADE,
+        position TEXT,
+        date_from INTEGER,
+        date_to INTEGER,
+        start_time INTEGER NOT NULL,
+        end_time INTEGER NOT NULL,
+        CHECK (employee_id IS NULL OR position IS NULL)
+    )''')
+    cursor.execute("CREATE INDEX idx_schedules_employee ON schedules (employee_id)")
+
+    # Смена, действовавшая в день записи, хранится в самой записи: статистика считается
+    # одним проходом без поиска графика для каждой строки
+    cursor.execute("ALTER TABLE time_records ADD COLUMN shift_start INTEGER")
+    cursor.execute("ALTER TABLE time_records ADD COLUMN shift_end INTEGER")
+    cursor.execute('''
+    UPDATE time_records SET
+        shift_start = (SELECT start_time FROM work_settings WHERE id = 1),
+        shift_end = (SELECT end_time FROM work_settings WHERE id = 1)''')
+
+    # Суммы в employee_stats не меняются: до графиков смена каждой записи совпадала с work_settings
+    add_new = '''
+        INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+        SELECT NEW.employee_id,
+               MAX(NEW.arrival_time - NEW.shift_start, 0),
+               MAX(NEW.departure_time - NEW.shift_end, 0),
+               NEW.departure_time - NEW.arrival_time,
+               1
+        WHERE NEW.arrival_time IS NOT NULL AND NEW.departure_time IS NOT NULL
+        ON CONFLICT (employee_id) DO UPDATE SET
+            delay_minutes = delay_minutes + excluded.delay_minutes,
+            overtime_minutes = overtime_minutes + excluded.overtime_minutes,
+            workday_minutes = workday_minutes + excluded.workday_minutes,
+            days = days + 1;'''
+
+    subtract_old = '''
+        UPDATE employee_stats SET
+            delay_minutes = delay_minutes - MAX(OLD.arrival_time - OLD.shift_start, 0),
+            overtime_minutes = overtime_minutes - MAX(OLD.departure_time - OLD.shift_end, 0),
+            workday_minutes = workday_minutes - (OLD.departure_time - OLD.arrival_time),
+            days = days - 1
+        WHERE employee_id = OLD.employee_id AND OLD.arrival_time IS NOT NULL AND OLD.departure_time IS NOT NULL;'''
+
+    cursor.execute("DROP TRIGGER time_records_stats_insert")
+    cursor.execute("DROP TRIGGER time_records_stats_delete")
+    cursor.execute("DROP TRIGGER time_records_stats_update")
+    cursor.execute(f"CREATE TRIGGER time_records_stats_insert AFTER INSERT ON time_records BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER time_records_stats_delete AFTER DELETE ON time_records BEGIN {subtract_old} END")
+    cursor.execute(f'''
+    CREATE TRIGGER time_records_stats_update
+    AFTER UPDATE OF employee_id, arrival_time, departure_time, shift_start, shift_end ON time_records
+    BEGIN {subtract_old} {add_new} END''')
+
+    # Статистика за период по-прежнему читается только из индекса
+    cursor.execute("DROP INDEX idx_time_records_date")
+    cursor.execute('''
+    CREATE INDEX idx_time_records_date
+    ON time_records (date, employee_id, arrival_time, departure_time, shift_start, shift_end)''')
+
+
+def _add_time_records_archive(cursor):
+    # Холодная таблица для закрытых периодов: та же структура, что у time_records, без триггеров
+    cursor.execute('''
+    CREATE TABLE time_records_archive (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER REFERENCES employees (id) ON DELETE CASCADE,
+        date INTEGER,
+        arrival_time INTEGER,
+        departure_time INTEGER,
+        shift_start INTEGER,
+        shift_end INTEGER
+    )''')
+    cursor.execute('''
+    CREATE UNIQUE INDEX idx_time_records_archive_employee_date
+    ON time_records_archive (employee_id, date)''')
+    cursor.execute('''
+    CREATE INDEX idx_time_records_archive_date
+    ON time_records_archive (date, employee_id, arrival_time, departure_time, shift_start, shift_end)''')
+
+    # Замороженные суммы по сотруднику за каждый архивный год: статистика за всё время
+    # складывается из employee_stats (активные записи) и этих сумм, без чтения архива
+    cursor.execute('''
+    CREATE TABLE archived_stats (
+        employee_id INTEGER NOT NULL REFERENCES employees (id) ON DELETE CASCADE,
+        year INTEGER NOT NULL,
+        delay_minutes INTEGER NOT NULL DEFAULT 0,
+        overtime_minutes INTEGER NOT NULL DEFAULT 0,
+        workday_minutes INTEGER NOT NULL DEFAULT 0,
+        days INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (employee_id, year)
+    )''')
+
+    # Граница архива: записи с датой раньше archived_before перенесены и закрыты для изменений
+    cursor.execute('''
+    CREATE TABLE archive_settings (
+        id INTEGER PRIMARY KEY,
+        archived_before INTEGER
+    )''')
+    cursor.execute("INSERT INTO archive_settings (id, archived_before) VALUES (1, NULL)")
+
+
+_DEFAULT_START = "(SELECT start_time FROM work_settings WHERE id = 1)"
+_DEFAULT_END = "(SELECT end_time FROM work_settings WHERE id = 1)"
+
+
+def _create_stats_triggers(cursor, guard=""):
+    # Построчные триггеры employee_stats с пустой сменой по умолчанию; guard - условие WHEN
+    add_new = f'''
+        INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+        SELECT NEW.employee_id,
+               MAX(NEW.arrival_time - COALESCE(NEW.shift_start, {_DEFAULT_START}), 0),
+               MAX(NEW.departure_time - COALESCE(NEW.shift_end, {_DEFAULT_END}), 0),
+               NEW.departure_time - NEW.arrival_time,
+               1
+        WHERE NEW.arrival_time IS NOT NULL AND NEW.departure_time IS NOT NULL
+        ON CONFLICT (employee_id) DO UPDATE SET
+            delay_minutes = delay_minutes + excluded.delay_minutes,
+            overtime_minutes = overtime_minutes + excluded.overtime_minutes,
+            workday_minutes = workday_minutes + excluded.workday_minutes,
+            days = days + 1;'''
+
+    subtract_old = f'''
+        UPDATE employee_stats SET
+            delay_minutes = delay_minutes - MAX(OLD.arrival_time - COALESCE(OLD.shift_start, {_DEFAULT_START}), 0),
+            overtime_minutes = overtime_minutes - MAX(OLD.departure_time - COALESCE(OLD.shift_end, {_DEFAULT_END}), 0),
+            workday_minutes = workday_minutes - (OLD.departure_time - OLD.arrival_time),
+            days = days - 1
+        WHERE employee_id = OLD.employee_id AND OLD.arrival_time IS NOT NULL AND OLD.departure_time IS NOT NULL;'''
+
+    cursor.execute(f"CREATE TRIGGER time_records_stats_insert AFTER INSERT ON time_records {guard} BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER time_records_stats_delete AFTER DELETE ON time_records {guard} BEGIN {subtract_old} END")
+    cursor.execute(f'''
+    CREATE TRIGGER time_records_stats_update
+    AFTER UPDATE OF employee_id, arrival_time, departure_time, shift_start, shift_end ON time_records {guard}
+    BEGIN {subtract_old} {add_new} END''')
+
+
+def _drop_stats_triggers(cursor):
+    cursor.execute("DROP TRIGGER time_records_stats_insert")
+    cursor.execute("DROP TRIGGER time_records_stats_delete")
+    cursor.execute("DROP TRIGGER time_records_stats_update")
+
+
+def _store_default_shift_as_null(cursor):
+    # Пустая смена в записи - смена по умолчанию из work_settings. Её больше не копируют в каждую
+    # запись, поэтому изменение настроек рабочего дня не переписывает записи, а только пересобирает
+    # employee_stats. Явная смена остаётся у записей, на которые действует график.
+    _drop_stats_triggers(cursor)
+
+    # Смена записи, на которую не действует ни один график, - смена по умолчанию
+    cursor.execute('''
+    UPDATE time_records SET shift_start = NULL, shift_end = NULL
+    WHERE NOT EXISTS (
+        SELECT 1 FROM schedules s
+        WHERE (s.employee_id = time_records.employee_id
+               OR s.position = (SELECT position FROM employees WHERE id = time_records.employee_id)
+               OR (s.employee_id IS NULL AND s.position IS NULL))
+          AND (s.date_from IS NULL OR s.date_from <= time_records.date)
+          AND (s.date_to IS NULL OR s.date_to >= time_records.date)
+    )''')
+
+    _create_stats_triggers(cursor)
+
+    # Суммы пересобираются: смены, которые разошлись с настройками, теперь считаются по ним
+    cursor.execute("DELETE FROM employee_stats")
+    cursor.execute(f'''
+    INSERT INTO employee_stats (employee_id, delay_minutes, overtime_minutes, workday_minutes, days)
+    SELECT employee_id,
+           SUM(MAX(arrival_time - COALESCE(shift_start, {_DEFAULT_START}), 0)),
+           SUM(MAX(departure_time - COALESCE(shift_end, {_DEFAULT_END}), 0)),
+           SUM(departure_time - arrival_time),
+           COUNT(*)
+    FROM time_records
+    WHERE arrival_time IS NOT NULL AND departure_time IS NOT NULL
+    GROUP BY employee_id''')
+
+
+def _add_employees_version(cursor):
+    # Счётчик изменений таблицы employees: поисковый индекс сотрудников перестраивается только
+    # при его изменении, а не после любого коммита (PRAGMA data_version)
+    cursor.execute('''
+    CREATE TABLE employees_version (
+        id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    )''')
+    cursor.execute("INSERT INTO employees_version (id, version) VALUES (1, 0)")
+
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f'''
+        CREATE TRIGGER employees_version_{event.lower()} AFTER {event} ON employees
+        BEGIN UPDATE employees_version SET version = version + 1 WHERE id = 1; END''')
+
+
+
+def _add_stats_triggers_guard(cursor):
+    # Массовые операции (пересчёт смен, перенос в архив) собирают employee_stats заново и на время
+    # своей транзакции выключают построчные триггеры флагом, а не удалением триггеров: изменение
+    # схемы берёт эксклюзивную блокировку и заставляет остальные соединения заново готовить запросы
+    cursor.execute('''
+    CREATE TABLE stats_triggers (
+        id INTEGER PRIMARY KEY,
+        suspended INTEGER NOT NULL
+    )''')
+    cursor.execute("INSERT INTO stats_triggers (id, suspended) VALUES (1, 0)")
+
+    _drop_stats_triggers(cursor)
+    _create_stats_triggers(cursor, "WHEN (SELECT suspended FROM stats_triggers WHERE id = 1) = 0")
+
+
+MIGRATIONS = [
+    _create_initial_schema,
+    _add_time_record_indexes,
+    _store_times_as_integers,
+    _add_employee_stats_summary,
+    _remove_orphan_time_records,
+    _add_time_records_date_index,
+    _add_open_records_index,
+    _add_work_schedules,
+    _add_time_records_archive,
+    _store_default_shift_as_null,
+    _add_employees_version,
+    _add_stats_triggers_guard,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target_version=SCHEMA_VERSION):
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"Версия базы данных {version} новее поддерживаемой {SCHEMA_VERSION}")
+
+    for number in range(version + 1, target_version + 1):
+        # Каждая миграция вместе с user_version применяется в отдельной транзакции
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            MIGRATIONS[number - 1](cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
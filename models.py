@@ -1,24 +1,70 @@
-class Employee:
-    def __init__(self, id=None, name="", position="", hire_date=""):
-        self.id = id
-        self.name = name
-        self.position = position
-        self.hire_date = hire_date
+from collections import namedtuple
+from datetime import date
+
+# Даты хранятся как число дней от 1970-01-01, время - как число минут от полуночи
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def date_to_day(value):
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def day_to_date(day):
+    return date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+def time_to_minutes(value):
+    if not value:
+        return None
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_to_time(minutes):
+    if minutes is None:
+        return ""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def row_factory(model):
+    # Фабрика строк sqlite3: модель создаётся из строки через tuple.__new__, без разбора
+    # аргументов конструктора - вызывается на каждую строку выборки
+    new = tuple.__new__
+
+    def make(cursor, row):
+        return new(model, row)
+    return make
+
+
+# Модели - именованные кортежи без __dict__: экземпляр занимает столько же, сколько строка
+# из sqlite3, и по-прежнему индексируется как кортеж
+class Employee(namedtuple("Employee", ("id", "name", "position", "hire_date"), defaults=(None, "", "", ""))):
+    __slots__ = ()
 
     @staticmethod
     def from_db_row(row):
         if not row:
             return None
-        return Employee(row[0], row[1], row[2], row[3])
+        return Employee(*row)
+
+
+class TimeRecord(namedtuple("TimeRecord", ("day", "arrival", "departure"), defaults=(None, None, None))):
+    __slots__ = ()
+
+    @property
+    def date(self):
+        return day_to_date(self.day)
+
+    @property
+    def arrival_time(self):
+        return minutes_to_time(self.arrival)
 
-class TimeRecord:
-    def __init__(self, date="", arrival_time="", departure_time=""):
-        self.date = date
-        self.arrival_time = arrival_time
-        self.departure_time = departure_time
+    @property
+    def departure_time(self):
+        return minutes_to_time(self.departure)
 
     @staticmethod
     def from_db_row(row):
         if not row:
             return None
-        return TimeRecord(row[0], row[1], row[2])
+        return TimeRecord(*row)
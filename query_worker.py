@@ -0,0 +1,104 @@
+import threading
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+from database import Database
+
+
+def call_database(database, method, args):
+    # method - имя метода Database или функция, принимающая базу первым аргументом
+    if callable(method):
+        return method(database, *args)
+    return getattr(database, method)(*args)
+
+
+class _Worker(QObject):
+    finished = Signal(str, int, object)
+    failed = Signal(str, int, str)
+
+    def __init__(self, db_name, generations, lock):
+        super().__init__()
+        self.db_name = db_name
+        self.database = None
+        self._generations = generations
+        self._lock = lock
+
+    @Slot(str, int, object, object)
+    def run(self, key, generation, method, args):
+        # Запрос, который успели заменить более новым с тем же ключом, не выполняем
+        with self._lock:
+            if self._generations.get(key) != generation:
+                return
+
+        # Соединение создаётся в потоке обработчика и используется только в нём
+        if self.database is None:
+            self.database = Database(self.db_name)
+
+        try:
+            result = call_database(self.database, method, args)
+        except Exception as e:
+            self.failed.emit(key, generation, str(e))
+            return
+
+        self.finished.emit(key, generation, result)
+
+    @Slot()
+    def close(self):
+        if self.database is not None:
+            self.database.close()
+            self.database = None
+        QThread.currentThread().quit()
+
+
+class QueryWorker(QObject):
+    # Выполняет методы Database в отдельном потоке со своим соединением.
+    # Для каждого ключа важен только последний запрос: более ранние пропускаются или отбрасываются.
+    failed = Signal(str, str)
+
+    _request = Signal(str, int, object, object)
+    _close = Signal()
+
+    def __init__(self, db_name, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._callbacks = {}
+
+        self._thread = QThread(self)
+        self._worker = _Worker(db_name, self._generations, self._lock)
+        self._worker.moveToThread(self._thread)
+
+        self._request.connect(self._worker.run)
+        self._close.connect(self._worker.close)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+
+        self._thread.start()
+
+    def submit(self, key, method, args, callback):
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        self._callbacks[key] = callback
+        self._request.emit(key, generation, method, tuple(args))
+
+    def stop(self):
+        if self._thread.isRunning():
+            self._close.emit()
+            self._thread.wait()
+
+    def _is_current(self, key, generation):
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def _on_finished(self, key, generation, result):
+        if not self._is_current(key, generation):
+            return
+        callback = self._callbacks.pop(key, None)
+        if callback is not None:
+            callback(result)
+
+    def _on_failed(self, key, generation, message):
+        if not self._is_current(key, generation):
+            return
+        self._callbacks.pop(key, None)
+        self.failed.emit(key, message)
@@ -0,0 +1,39 @@
+from PySide6.QtCore import QObject, QTimer
+
+
+class RefreshScheduler(QObject):
+    # Изменения только помечают представления устаревшими; обновление выполняется один раз
+    # в следующем цикле событий, сколько бы пометок ни пришло до него.
+    # Пометка - либо целиком (keys=None), либо набор ключей (сотрудники, записи), которые
+    # получает обработчик, чтобы обновить только их.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._views = {}
+        self._dirty = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def register(self, name, handler, visible=None):
+        # Представления обновляются в порядке регистрации. Невидимое (visible() ложно)
+        # остаётся помеченным до flush, при котором оно будет видно
+        self._views[name] = (handler, visible)
+
+    def mark(self, name, keys=None):
+        if name in self._dirty and self._dirty[name] is None:
+            pass
+        elif keys is None:
+            self._dirty[name] = None
+        else:
+            self._dirty.setdefault(name, set()).update(keys)
+        self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        for name, (handler, visible) in self._views.items():
+            if name not in self._dirty or (visible is not None and not visible()):
+                continue
+            # Пометки, сделанные обработчиком, для представлений ниже по порядку обработаются
+            # в этом же проходе, для остальных - в следующем цикле событий
+            handler(self._dirty.pop(name))
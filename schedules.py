@@ -0,0 +1,107 @@
+# Графики смен: правила с периодом действия для сотрудника, должности или всей компании.
+# Приоритет: сотрудник > должность > вся компания > настройки рабочего дня (work_settings).
+# Правила каждого сотрудника заранее сводятся в непересекающиеся интервалы дней,
+# поэтому смена для записи находится двоичным поиском, а не перебором правил.
+from bisect import bisect_right
+
+# Границы для правил без даты начала или окончания
+MIN_DAY = -(1 << 31)
+MAX_DAY = (1 << 31) - 1
+
+
+class Timeline:
+    # Интервалы дней одного сотрудника: starts[i] - первый день интервала, shifts[i] - (начало, конец) смены.
+    # Интервалы покрывают все дни подряд, соседние с одинаковой сменой объединены.
+    __slots__ = ("starts", "shifts")
+
+    def __init__(self, starts, shifts):
+        self.starts = starts
+        self.shifts = shifts
+
+    def resolve(self, day):
+        return self.shifts[bisect_right(self.starts, day) - 1]
+
+    def segments(self, date_from=None, date_to=None):
+        # (первый день, последний день, смена) для интервалов, пересекающихся с периодом
+        date_from = MIN_DAY if date_from is None else date_from
+        date_to = MAX_DAY if date_to is None else date_to
+
+        for i in range(max(bisect_right(self.starts, date_from) - 1, 0), len(self.starts)):
+            first = self.starts[i]
+            if first > date_to:
+                break
+            last = self.starts[i + 1] - 1 if i + 1 < len(self.starts) else MAX_DAY
+            yield max(first, date_from), min(last, date_to), self.shifts[i]
+
+
+def build_timeline(default, rules):
+    # rules - (date_from, date_to, start_time, end_time) в порядке возрастания приоритета:
+    # правило, наложенное позже, перекрывает предыдущие на своём периоде
+    rules = [
+        (MIN_DAY if date_from is None else date_from, MAX_DAY if date_to is None else date_to, (start, end))
+        for date_from, date_to, start, end in rules
+    ]
+    points = {MIN_DAY}
+    for first, last, _ in rules:
+        points.add(first)
+        if last < MAX_DAY:
+            points.add(last + 1)
+
+    starts = []
+    shifts = []
+    for point in sorted(points):
+        shift = default
+        for first, last, rule_shift in rules:
+            if first <= point <= last:
+                shift = rule_shift
+        if not shifts or shifts[-1] != shift:
+            starts.append(point)
+            shifts.append(shift)
+    return Timeline(starts, shifts)
+
+
+class ScheduleIndex:
+    # default - смена дней без графика (Database передаёт (None, None): такие записи считаются
+    # по текущим work_settings); schedules - строки таблицы schedules
+    # (id, employee_id, position, date_from, date_to, start_time, end_time); positions - {id сотрудника: должность}
+    def __init__(self, default, schedules, positions):
+        self.default = tuple(default)
+        self.positions = positions
+        self._global = []
+        self._by_position = {}
+        self._by_employee = {}
+        self._timelines = {}
+
+        # Внутри одного уровня позже начавшееся правило важнее, при равных датах - добавленное позже
+        for _, employee_id, position, date_from, date_to, start, end in sorted(
+                schedules, key=lambda row: (MIN_DAY if row[3] is None else row[3], row[0])):
+            rule = (date_from, date_to, start, end)
+            if employee_id is not None:
+                self._by_employee.setdefault(employee_id, []).append(rule)
+            elif position is not None:
+                self._by_position.setdefault(position, []).append(rule)
+            else:
+                self._global.append(rule)
+
+    def timeline(self, employee_id):
+        timeline = self._timelines.get(employee_id)
+        if timeline is None:
+            rules = (self._global
+                     + self._by_position.get(self.positions.get(employee_id), [])
+                     + self._by_employee.get(employee_id, []))
+            timeline = build_timeline(self.default, rules)
+            # Сотрудника, которого не было при построении индекса, не запоминаем: должность ещё неизвестна
+            if employee_id in self.positions:
+                self._timelines[employee_id] = timeline
+        return timeline
+
+    def resolve(self, employee_id, day):
+        return self.timeline(employee_id).resolve(day)
+
+    def employees_for(self, employee_id=None, position=None):
+        # Сотрудники, на которых действует правило с такой областью
+        if employee_id is not None:
+            return [employee_id]
+        if position is not None:
+            return [key for key, value in self.positions.items() if value == position]
+        return list(self.positions)
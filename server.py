@@ -0,0 +1,305 @@
+# Локальный HTTP-сервис для терминалов учёта: отметки прихода и ухода, пакетная загрузка и статистика.
+# Работает без PySide6: python server.py --db employee_time_tracking.db --port 8080
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+from database import DEFAULT_PROFILE, PROFILES, Database
+from models import date_to_day, minutes_to_time
+
+MAX_BODY_SIZE = 10 * 1024 * 1024
+MAX_BATCH = 1000
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DatabaseThread:
+    # Отдельный поток со своим соединением: sqlite3 не разрешает использовать соединение из других потоков
+    def __init__(self, db_name, profile):
+        self.database = None
+        self._executor = ThreadPoolExecutor(max_workers=1, initializer=self._open, initargs=(db_name, profile))
+
+    def _open(self, db_name, profile):
+        self.database = Database(db_name, profile)
+
+    async def call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self.database, *args))
+
+    def close(self):
+        self._executor.submit(lambda: self.database and self.database.close()).result()
+        self._executor.shutdown()
+
+
+def parse_event(item, kind=None):
+    # Событие: employee_id, type (in/out), date (YYYY-MM-DD) и time (HH:MM); без даты и времени - текущие
+    if not isinstance(item, dict):
+        raise HTTPError(400, "Событие должно быть объектом")
+
+    kind = kind or item.get("type")
+    if kind not in ("in", "out"):
+        raise HTTPError(400, "type должен быть in или out")
+
+    now = datetime.now()
+    try:
+        employee_id = int(item["employee_id"])
+        day = date_to_day(datetime.strptime(item["date"], "%Y-%m-%d").date()) if item.get("date") \
+            else date_to_day(now.date())
+        moment = datetime.strptime(item["time"], "%H:%M") if item.get("time") else now
+        minutes = moment.hour * 60 + moment.minute
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPError(400, f"Некорректное событие: {e}") from e
+
+    return employee_id, day, kind, minutes
+
+
+def apply_clock_events(database, events):
+    # Все события пачки пишутся одной транзакцией; возвращает HTTPError или None для каждого события
+    errors = [None] * len(events)
+    accepted = []
+    boundary = database.get_archive_boundary()
+
+    for index, event in enumerate(events):
+        if database.get_employee(event[0]) is None:
+            errors[index] = HTTPError(404, f"Сотрудник {event[0]} не найден")
+        elif boundary is not None and event[1] < boundary:
+            errors[index] = HTTPError(409, "Период перенесён в архив и закрыт для изменений")
+        else:
+            accepted.append(event)
+
+    database.record_clock_events(accepted)
+    return errors
+
+
+class ClockServer:
+    def __init__(self, db_name, profile=DEFAULT_PROFILE, max_batch=MAX_BATCH):
+        self.max_batch = max_batch
+        self.writer = DatabaseThread(db_name, profile)
+        self.reader = DatabaseThread(db_name, profile)
+        self.queue = asyncio.Queue()
+        self.events_written = 0
+        self.commits = 0
+        self._writer_task = None
+        self._server = None
+
+    async def start(self, host, port):
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self.writer.close()
+        self.reader.close()
+
+    async def submit(self, events):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((events, future))
+        return await future
+
+    async def _write_loop(self):
+        # Единственный писатель: всё, что накопилось в очереди, фиксируется одним коммитом
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            while size < self.max_batch and not self.queue.empty():
+                item = self.queue.get_nowait()
+                pending.append(item)
+                size += len(item[0])
+
+            events = [event for batch, _ in pending for event in batch]
+            try:
+                errors = await self.writer.call(apply_clock_events, events)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.events_written += sum(error is None for error in errors)
+            self.commits += 1
+
+            offset = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(errors[offset:offset + len(batch)])
+                offset += len(batch)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise HTTPError(413, "Слишком большой запрос")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n")
+                if not keep_alive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + data)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        routes = {
+            ("POST", "/clock-in"): self.clock_in,
+            ("POST", "/clock-out"): self.clock_out,
+            ("POST", "/events"): self.ingest,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/on-site"): self.on_site,
+        }
+        handler = routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in routes):
+                raise HTTPError(405, "Метод не поддерживается")
+            raise HTTPError(404, "Не найдено")
+
+        if method == "GET":
+            return await handler({key: values[-1] for key, values in parse_qs(url.query).items()})
+
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"Некорректный JSON: {e}") from e
+        return await handler(data)
+
+    async def clock_in(self, data):
+        return await self._clock(parse_event(data, "in"))
+
+    async def clock_out(self, data):
+        return await self._clock(parse_event(data, "out"))
+
+    async def _clock(self, event):
+        error = (await self.submit([event]))[0]
+        if error:
+            raise error
+        return {"employee_id": event[0], "type": event[2], "status": "ok"}
+
+    async def ingest(self, data):
+        items = data.get("events") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise HTTPError(400, "Ожидается список events")
+
+        events = []
+        rejected = []
+        for index, item in enumerate(items):
+            try:
+                events.append((index, parse_event(item)))
+            except HTTPError as e:
+                rejected.append({"index": index, "error": str(e)})
+
+        errors = await self.submit([event for _, event in events]) if events else []
+        for (index, _), error in zip(events, errors):
+            if error:
+                rejected.append({"index": index, "error": str(error)})
+
+        rejected.sort(key=lambda item: item["index"])
+        return {"accepted": len(items) - len(rejected), "rejected": rejected}
+
+    async def stats(self, params):
+        try:
+            date_from = date_to_day(datetime.strptime(params["from"], "%Y-%m-%d").date()) if "from" in params else None
+            date_to = date_to_day(datetime.strptime(params["to"], "%Y-%m-%d").date()) if "to" in params else None
+            employee_id = int(params["employee_id"]) if "employee_id" in params else None
+        except ValueError as e:
+            raise HTTPError(400, f"Некорректный параметр: {e}") from e
+
+        if employee_id is None:
+            return await self.reader.call(Database.get_company_stats, date_from, date_to)
+        return await self.reader.call(Database.get_employee_stats, employee_id, date_from, date_to)
+
+    async def on_site(self, params):
+        try:
+            day = date_to_day(datetime.strptime(params["date"], "%Y-%m-%d").date()) if "date" in params \
+                else date_to_day(datetime.now().date())
+        except ValueError as e:
+            raise HTTPError(400, f"Некорректный параметр: {e}") from e
+
+        rows = await self.reader.call(Database.get_on_site, day)
+        return [
+            {"employee_id": employee_id, "name": name, "position": position, "arrival_time": minutes_to_time(arrival)}
+            for employee_id, name, position, arrival in rows
+        ]
+
+
+async def serve(args):
+    server = ClockServer(args.db, args.profile, args.max_batch)
+    listener = await server.start(args.host, args.port)
+    print(f"Сервер запущен на http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP-сервис для терминалов учёта рабочего времени")
+    parser.add_argument("--db", default="employee_time_tracking.db", help="путь к базе данных")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help="профиль настроек соединения SQLite")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="максимум событий в одном коммите")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
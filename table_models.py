@@ -0,0 +1,150 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from models import minutes_to_time
+
+
+class LazyTableModel(QAbstractTableModel):
+    # Строки подгружаются из базы страницами по мере прокрутки, текст ячеек формируется в data()
+    headers = ()
+    page_size = 200
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self._rows = []
+        self._exhausted = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        rows = self._fetch_page(self._rows[-1] if self._rows else None)
+        self._exhausted = len(rows) < self.page_size
+        if not rows:
+            return
+
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def reload(self):
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def row(self, index):
+        return self._rows[index]
+
+    def _fetch_page(self, last_row):
+        raise NotImplementedError
+
+
+class EmployeeTableModel(LazyTableModel):
+    # Одна модель используется таблицей сотрудников и обоими списками выбора (колонка ФИО)
+    headers = ("ID", "ФИО", "Должность", "Дата найма")
+    NAME_COLUMN = 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        employee = self._rows[index.row()]
+        if role == Qt.UserRole:
+            return employee.id
+        if role != Qt.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == 0:
+            return str(employee.id)
+        if column == 3:
+            hire_date = employee.hire_date
+            return f"{hire_date[8:10]}.{hire_date[5:7]}.{hire_date[0:4]}"
+        return employee[column]
+
+    def find(self, employee_id, start=0):
+        # Строка сотрудника среди загруженных страниц (начиная со start) или -1
+        for row in range(start, len(self._rows)):
+            if self._rows[row].id == employee_id:
+                return row
+        return -1
+
+    def locate(self, employee_id):
+        # Как find, но догружает страницы, пока сотрудник не найдётся
+        row = self.find(employee_id)
+        while row < 0 and employee_id is not None and self.canFetchMore():
+            loaded = len(self._rows)
+            self.fetchMore()
+            row = self.find(employee_id, loaded)
+        return row
+
+    def _fetch_page(self, last_row):
+        after = (last_row.name, last_row.id) if last_row else None
+        return self.database.get_all_employees(limit=self.page_size, after=after)
+
+
+class TimeRecordTableModel(LazyTableModel):
+    headers = ("Дата", "Время прихода", "Время ухода")
+
+    def __init__(self, database, parent=None):
+        super().__init__(database, parent)
+        self.employee_id = None
+
+    def set_employee(self, employee_id):
+        self.employee_id = employee_id
+        self.reload()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        record = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return record.date.strftime("%d.%m.%Y")
+        return minutes_to_time(record[column])
+
+    def update_record(self, day):
+        # Перечитывает одну запись и меняет или вставляет её строку, не перезагружая историю.
+        # Строки идут по убыванию даты; запись старше загруженных страниц придёт с fetchMore
+        if self.employee_id is None:
+            return
+        record = self.database.get_time_record(self.employee_id, day)
+
+        row = 0
+        while row < len(self._rows) and self._rows[row].day > day:
+            row += 1
+
+        if row < len(self._rows) and self._rows[row].day == day:
+            if record is None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+            else:
+                self._rows[row] = record
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+        elif record is not None and (row < len(self._rows) or self._exhausted):
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.insert(row, record)
+            self.endInsertRows()
+
+    def _fetch_page(self, last_row):
+        if self.employee_id is None:
+            return []
+        before = last_row.day if last_row else None
+        return self.database.get_time_records(self.employee_id, limit=self.page_size, before=before)
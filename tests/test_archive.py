@@ -0,0 +1,30 @@
+import unittest
+
+from database import Database
+from models import date_to_day
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.employee_id = self.db.add_employee("Иванов Иван", "Инженер", "2020-01-01")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_archive_twice_with_reused_record_ids(self):
+        # Запись, добавленная после первого переноса, получает id перенесённой записи
+        self.db.add_time_record(self.employee_id, 20000, 540, 1080)
+        self.db.add_time_record(self.employee_id, 18000, 560, 1100)
+        self.assertEqual(self.db.archive_before(19000), 1)
+
+        self.db.add_time_record(self.employee_id, 19500, 600, 1060)
+        self.assertEqual(self.db.archive_before(19900), 1)
+
+        self.assertEqual(self.db.get_archive_boundary(), 19900)
+        days = [date_to_day(record.date) for record in self.db.iter_time_records(self.employee_id)]
+        self.assertEqual(days, [18000, 19500, 20000])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,23 +1,105 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QDateEdit, QTimeEdit,
-    QTableWidget, QTableWidgetItem, QComboBox, QFormLayout,
-    QGroupBox, QTabWidget, QMessageBox, QHeaderView
+    QTableView, QTableWidget, QTableWidgetItem, QComboBox, QFormLayout,
+    QGroupBox, QTabWidget, QMessageBox, QHeaderView, QCheckBox, QFileDialog, QCompleter
 )
-from PySide6.QtCore import QDate, QTime
-from datetime import datetime
-from models import Employee, TimeRecord
+from PySide6.QtCore import QDate, QModelIndex, QSignalBlocker, Qt, QTime, Signal
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from export import export_report
+from models import day_to_date
+from query_worker import call_database
+from refresh_scheduler import RefreshScheduler
+from table_models import EmployeeTableModel, TimeRecordTableModel
+
+_EPOCH = QDate(1970, 1, 1)
+
+
+def _qtime_to_minutes(qtime):
+    return qtime.hour() * 60 + qtime.minute()
+
+
+def _minutes_to_qtime(minutes):
+    return QTime(minutes // 60, minutes % 60)
+
+
+def _qdate_to_day(qdate):
+    return _EPOCH.daysTo(qdate)
+
+
+class EmployeeSearchEdit(QLineEdit):
+    # Строка поиска сотрудника: по мере ввода показывает подсказки из Database.search_employees
+    # (через query окна, то есть в фоновом потоке, если он есть), выбранный id - в сигнале selected
+    selected = Signal(int)
+
+    def __init__(self, query, key, parent=None):
+        super().__init__(parent)
+        self.query = query
+        self.key = key
+        self.setPlaceholderText("Поиск по ФИО или должности")
+        self.setClearButtonEnabled(True)
+
+        # Подсказки уже отобраны и упорядочены поиском, completer их не фильтрует
+        self.results = QStandardItemModel(self)
+        self.completer = QCompleter(self.results, self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.activated[QModelIndex].connect(self.on_activated)
+        self.textEdited.connect(self.on_text_edited)
+
+    def on_text_edited(self, text):
+        if text.strip():
+            self.query(self.key, "search_employees", (text,), self.show_results)
+        else:
+            self.show_results([])
+
+    def show_results(self, employees):
+        self.results.clear()
+        for employee in employees:
+            item = QStandardItem(f"{employee.name} — {employee.position}")
+            item.setData(employee.id, Qt.UserRole)
+            self.results.appendRow(item)
+
+        if employees and self.text().strip():
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def on_activated(self, index):
+        self.clear()
+        self.selected.emit(index.data(Qt.UserRole))
+
 
 class MainWindow(QMainWindow):
-    def __init__(self, database):
+    EMPLOYEE_TAB, TIME_TAB, STATS_TAB = range(3)
+
+    def __init__(self, database, query_worker=None):
         super().__init__()
         self.database = database
+        self.query_worker = query_worker
+        if query_worker is not None:
+            query_worker.failed.connect(self.on_query_failed)
+        self.employee_model = EmployeeTableModel(database, self)
+        self.time_record_model = TimeRecordTableModel(database, self)
         self.setWindowTitle("Система учёта рабочего времени")
         self.setMinimumSize(800, 600)
 
+        # Изменения помечают затронутые представления, а обновляются они один раз в следующем
+        # цикле событий и только на открытой вкладке: остальные - при её показе
+        self.refresh_scheduler = RefreshScheduler(self)
+        self.refresh_scheduler.register("employees", self.update_employees)
+        self.refresh_scheduler.register("history", self.update_time_history, self.tab_visible(self.TIME_TAB))
+        for name, handler in (("employee_stats", self.update_employee_stats),
+                              ("company_stats", self.update_company_stats),
+                              ("period_stats", self.update_period_stats)):
+            self.refresh_scheduler.register(name, handler, self.tab_visible(self.STATS_TAB))
+
+        # Вкладки строятся при первом показе. Всё помечено устаревшим, поэтому данные открытой
+        # вкладки загружаются в первом цикле событий, когда окно уже показано
+        self._built_tabs = set()
         self.init_ui()
-        self.refresh_employees_list()
-        self.refresh_statistics()
+        for name in ("employees", "history", "employee_stats", "company_stats", "period_stats"):
+            self.refresh_scheduler.mark(name)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -30,8 +112,8 @@ class MainWindow(QMainWindow):
 
         # Получаем текущие настройки рабочего времени
         work_settings = self.database.get_work_settings()
-        start_time = QTime.fromString(work_settings[0], "HH:mm")
-        end_time = QTime.fromString(work_settings[1], "HH:mm")
+        start_time = _minutes_to_qtime(work_settings[0])
+        end_time = _minutes_to_qtime(work_settings[1])
 
         settings_layout.addWidget(QLabel("Начало рабочего дня:"))
         self.work_start_time = QTimeEdit(start_time)
@@ -47,23 +129,42 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(settings_group)
 
-        # Табы для разных функций
-        tabs = QTabWidget()
-        main_layout.addWidget(tabs)
+        # Табы для разных функций: сначала пустые, содержимое строит build_tab
+        self.tabs = QTabWidget()
+        for title in ("Сотрудники", "Учет времени", "Статистика"):
+            self.tabs.addTab(QWidget(), title)
+        main_layout.addWidget(self.tabs)
+
+        self.build_tab(self.tabs.currentIndex())
+        self.tabs.currentChanged.connect(self.on_tab_changed)
 
-        # Таб сотрудников
-        employee_tab = QWidget()
+    def build_tab(self, index):
+        if index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        builders = (self.init_employee_tab, self.init_time_tab, self.init_stats_tab)
+        builders[index](self.tabs.widget(index))
+
+    def tab_visible(self, index):
+        return lambda: self.tabs.currentIndex() == index
+
+    def on_tab_changed(self, index):
+        self.build_tab(index)
+        self.refresh_scheduler.flush()
+
+    def init_employee_tab(self, employee_tab):
         employee_layout = QHBoxLayout(employee_tab)
 
         # Левая часть - список сотрудников
         employee_list_group = QGroupBox("Список сотрудников")
         employee_list_layout = QVBoxLayout(employee_list_group)
 
-        self.employee_table = QTableWidget(0, 4)
-        self.employee_table.setHorizontalHeaderLabels(["ID", "ФИО", "Должность", "Дата найма"])
+        self.employee_table = QTableView()
+        self.employee_table.setModel(self.employee_model)
         self.employee_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.employee_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.employee_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.employee_table.verticalHeader().setVisible(False)
+        self.employee_table.setSelectionBehavior(QTableView.SelectRows)
+        self.employee_table.setEditTriggers(QTableView.NoEditTriggers)
         self.employee_table.selectionModel().selectionChanged.connect(self.on_employee_selected)
         self.employee_table.setColumnHidden(0, True)
 
@@ -97,16 +198,22 @@ class MainWindow(QMainWindow):
 
         employee_layout.addWidget(employee_control_group)
 
-        # Таб учета времени
-        time_tab = QWidget()
+    def init_time_tab(self, time_tab):
         time_layout = QVBoxLayout(time_tab)
 
         # Выбор сотрудника
         employee_select_layout = QHBoxLayout()
         employee_select_layout.addWidget(QLabel("Выберите сотрудника:"))
         self.employee_combo = QComboBox()
+        self.employee_combo.setModel(self.employee_model)
+        self.employee_combo.setModelColumn(EmployeeTableModel.NAME_COLUMN)
         self.employee_combo.currentIndexChanged.connect(self.on_employee_combo_changed)
         employee_select_layout.addWidget(self.employee_combo)
+
+        self.employee_search = EmployeeSearchEdit(self.query, "search_employee")
+        self.employee_search.selected.connect(
+            lambda employee_id: self.select_employee(self.employee_combo, employee_id))
+        employee_select_layout.addWidget(self.employee_search)
         time_layout.addLayout(employee_select_layout)
 
         # Запись времени прихода и ухода
@@ -132,17 +239,60 @@ class MainWindow(QMainWindow):
         time_history_group = QGroupBox("История посещений")
         time_history_layout = QVBoxLayout(time_history_group)
 
-        self.time_history_table = QTableWidget(0, 3)
-        self.time_history_table.setHorizontalHeaderLabels(["Дата", "Время прихода", "Время ухода"])
+        self.time_history_table = QTableView()
+        self.time_history_table.setModel(self.time_record_model)
         self.time_history_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.time_history_table.verticalHeader().setVisible(False)
 
         time_history_layout.addWidget(self.time_history_table)
         time_layout.addWidget(time_history_group)
 
-        # Таб статистики
-        stats_tab = QWidget()
+    def init_stats_tab(self, stats_tab):
         stats_layout = QVBoxLayout(stats_tab)
 
+        # Выбор периода
+        period_group = QGroupBox("Период")
+        period_layout = QHBoxLayout(period_group)
+
+        self.stats_all_time = QCheckBox("За всё время")
+        self.stats_all_time.setChecked(True)
+        self.stats_all_time.toggled.connect(self.on_stats_period_changed)
+        period_layout.addWidget(self.stats_all_time)
+
+        period_layout.addWidget(QLabel("С:"))
+        self.stats_date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.stats_date_from.setDisplayFormat("dd.MM.yyyy")
+        self.stats_date_from.dateChanged.connect(self.on_stats_period_changed)
+        period_layout.addWidget(self.stats_date_from)
+
+        period_layout.addWidget(QLabel("По:"))
+        self.stats_date_to = QDateEdit(QDate.currentDate())
+        self.stats_date_to.setDisplayFormat("dd.MM.yyyy")
+        self.stats_date_to.dateChanged.connect(self.on_stats_period_changed)
+        period_layout.addWidget(self.stats_date_to)
+
+        period_layout.addWidget(QLabel("Группировка:"))
+        self.stats_group_by = QComboBox()
+        self.stats_group_by.addItem("Без группировки", None)
+        self.stats_group_by.addItem("По неделям", "week")
+        self.stats_group_by.addItem("По месяцам", "month")
+        self.stats_group_by.addItem("По должностям", "position")
+        self.stats_group_by.currentIndexChanged.connect(lambda: self.refresh_scheduler.mark("period_stats"))
+        period_layout.addWidget(self.stats_group_by)
+
+        export_timesheet_btn = QPushButton("Экспорт табеля")
+        export_timesheet_btn.clicked.connect(lambda: self.export_report("timesheet", "Табель"))
+        period_layout.addWidget(export_timesheet_btn)
+
+        export_lateness_btn = QPushButton("Экспорт опозданий")
+        export_lateness_btn.clicked.connect(lambda: self.export_report("lateness", "Опоздания"))
+        period_layout.addWidget(export_lateness_btn)
+
+        self.stats_date_from.setEnabled(False)
+        self.stats_date_to.setEnabled(False)
+
+        stats_layout.addWidget(period_group)
+
         # Статистика сотрудника
         employee_stats_group = QGroupBox("Статистика по сотруднику")
         employee_stats_layout = QFormLayout(employee_stats_group)
@@ -150,9 +300,17 @@ class MainWindow(QMainWindow):
         employee_stats_select = QHBoxLayout()
         employee_stats_select.addWidget(QLabel("Выберите сотрудника:"))
         self.stats_employee_combo = QComboBox()
-        self.stats_employee_combo.currentIndexChanged.connect(self.refresh_employee_stats)
+        self.stats_employee_combo.setModel(self.employee_model)
+        self.stats_employee_combo.setModelColumn(EmployeeTableModel.NAME_COLUMN)
+        self.stats_employee_combo.currentIndexChanged.connect(
+            lambda: self.refresh_scheduler.mark("employee_stats"))
         employee_stats_select.addWidget(self.stats_employee_combo)
 
+        self.stats_employee_search = EmployeeSearchEdit(self.query, "search_stats_employee")
+        self.stats_employee_search.selected.connect(
+            lambda employee_id: self.select_employee(self.stats_employee_combo, employee_id))
+        employee_stats_select.addWidget(self.stats_employee_search)
+
         employee_stats_layout.addRow(employee_stats_select)
 
         self.employee_avg_delay = QLabel("0:00")
@@ -179,17 +337,29 @@ class MainWindow(QMainWindow):
 
         stats_layout.addWidget(company_stats_group)
 
-        # Добавляем все табы
-        tabs.addTab(employee_tab, "Сотрудники")
-        tabs.addTab(time_tab, "Учет времени")
-        tabs.addTab(stats_tab, "Статистика")
+        # Статистика по неделям, месяцам или должностям
+        self.period_stats_group = QGroupBox("Статистика по группам")
+        period_stats_layout = QVBoxLayout(self.period_stats_group)
+
+        self.period_stats_table = QTableWidget(0, 6)
+        self.period_stats_table.setHorizontalHeaderLabels([
+            "Группа", "Сотрудников", "Дней", "Среднее опоздание", "Средняя переработка", "Средняя длительность"
+        ])
+        self.period_stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.period_stats_table.verticalHeader().setVisible(False)
+        self.period_stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        period_stats_layout.addWidget(self.period_stats_table)
+        stats_layout.addWidget(self.period_stats_group)
+        self.period_stats_group.setVisible(False)
 
     def save_work_settings(self):
-        start_time = self.work_start_time.time().toString("HH:mm")
-        end_time = self.work_end_time.time().toString("HH:mm")
+        start_time = _qtime_to_minutes(self.work_start_time.time())
+        end_time = _qtime_to_minutes(self.work_end_time.time())
 
-        self.database.update_work_settings(start_time, end_time)
-        self.refresh_statistics()
+        # Пересборка сумм проходит по всем записям, поэтому тоже уходит в фоновый поток
+        self.query("work_settings", "update_work_settings", (start_time, end_time),
+                   lambda result: self.mark_stats_dirty())
 
     def add_employee(self):
         name = self.employee_name.text().strip()
@@ -205,28 +375,29 @@ class MainWindow(QMainWindow):
         self.employee_name.clear()
         self.employee_position.clear()
 
-        self.refresh_employees_list()
+        # Новый сотрудник без записей входит в среднее по компании, но не в статистику по группам
+        self.refresh_scheduler.mark("employees")
+        self.refresh_scheduler.mark("company_stats")
 
     def remove_employee(self):
-        selected_items = self.employee_table.selectedItems()
-        if not selected_items:
+        selected_rows = self.employee_table.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "Предупреждение", "Выберите сотрудника для удаления")
             return
 
-        row = selected_items[0].row()
-        employee_id = int(self.employee_table.item(row, 0).text())
-        employee_name = self.employee_table.item(row, 1).text()
+        employee = self.employee_model.row(selected_rows[0].row())
 
         reply = QMessageBox.question(
             self,
             "Подтверждение",
-            f"Вы уверены, что хотите удалить сотрудника {employee_name}?",
+            f"Вы уверены, что хотите удалить сотрудника {employee.name}?",
             QMessageBox.Yes | QMessageBox.No
         )
 
         if reply == QMessageBox.Yes:
-            self.database.remove_employee(employee_id)
-            self.refresh_employees_list()
+            self.database.remove_employee(employee.id)
+            self.refresh_scheduler.mark("employees")
+            self.mark_stats_dirty([employee.id])
 
     def on_employee_selected(self):
         pass
@@ -237,79 +408,169 @@ class MainWindow(QMainWindow):
             return
 
         employee_id = self.employee_combo.currentData()
-        date = self.record_date.date().toString("yyyy-MM-dd")
-        arrival_time = self.arrival_time.time().toString("HH:mm")
-        departure_time = self.departure_time.time().toString("HH:mm")
+        day = _qdate_to_day(self.record_date.date())
+        arrival_time = _qtime_to_minutes(self.arrival_time.time())
+        departure_time = _qtime_to_minutes(self.departure_time.time())
+
+        try:
+            self.database.add_time_record(employee_id, day, arrival_time, departure_time)
+        except ValueError as e:
+            QMessageBox.warning(self, "Предупреждение", str(e))
+            return
+        # Одна запись: в истории обновляется одна строка, из статистики сотрудников - только его
+        self.refresh_scheduler.mark("history", [(employee_id, day)])
+        self.mark_stats_dirty([employee_id])
 
-        self.database.add_time_record(employee_id, date, arrival_time, departure_time)
-        self.refresh_time_history(employee_id)
-        self.refresh_statistics()
+    def mark_stats_dirty(self, employee_ids=None):
+        self.refresh_scheduler.mark("employee_stats", employee_ids)
+        self.refresh_scheduler.mark("company_stats")
+        self.refresh_scheduler.mark("period_stats")
 
     def refresh_time_history(self, employee_id):
-        records = self.database.get_time_records(employee_id)
-
-        self.time_history_table.setRowCount(len(records))
-
-        for row, record in enumerate(records):
-            time_record = TimeRecord.from_db_row(record)
-
-            date_obj = datetime.strptime(time_record.date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d.%m.%Y")
-
-            self.time_history_table.setItem(row, 0, QTableWidgetItem(formatted_date))
-            self.time_history_table.setItem(row, 1, QTableWidgetItem(time_record.arrival_time))
-            self.time_history_table.setItem(row, 2, QTableWidgetItem(time_record.departure_time))
+        self.time_record_model.set_employee(employee_id)
 
     def refresh_employees_list(self):
-        employees = self.database.get_all_employees()
-
-        self.employee_table.setRowCount(len(employees))
+        # Таблица и оба списка выбора показывают одну и ту же модель. Пока она перезагружается,
+        # сигналы списков заблокированы, а выбор затем восстанавливается по id сотрудника;
+        # зависящее от списка представление обновится, только если сотрудник сменился
+        combos = {}
+        if self.TIME_TAB in self._built_tabs:
+            combos[self.employee_combo] = "history"
+        if self.STATS_TAB in self._built_tabs:
+            combos[self.stats_employee_combo] = "employee_stats"
+
+        selected = {combo: combo.currentData() for combo in combos}
+        blockers = [QSignalBlocker(combo) for combo in combos]
+        self.employee_model.reload()
+        for combo in combos:
+            # Выбор восстанавливается только среди загруженных страниц: удалённого сотрудника
+            # нет ни на одной, и поиск по всем страницам загрузил бы весь список
+            row = self.employee_model.find(selected[combo])
+            combo.setCurrentIndex(0 if row < 0 and combo.count() > 0 else row)
+        for blocker in blockers:
+            blocker.unblock()
+
+        for combo, view in combos.items():
+            if combo.currentData() != selected[combo]:
+                self.refresh_scheduler.mark(view)
+
+    def select_employee(self, combo, employee_id):
+        # Явный выбор из строки поиска: сотрудник может быть ещё не загружен в модель,
+        # страницы догружаются до него
+        row = self.employee_model.locate(employee_id)
+        if row < 0 and combo.count() > 0:
+            row = 0
+        combo.setCurrentIndex(row)
+
+    def update_employees(self, keys):
+        self.refresh_employees_list()
 
-        for row, emp_data in enumerate(employees):
-            employee = Employee.from_db_row(emp_data)
+    def update_time_history(self, keys):
+        # keys - (id сотрудника, день) изменённых записей
+        employee_id = self.employee_combo.currentData()
+        if keys is None or employee_id != self.time_record_model.employee_id:
+            self.refresh_time_history(employee_id)
+            return
+        for record_employee_id, day in keys:
+            if record_employee_id == employee_id:
+                self.time_record_model.update_record(day)
 
-            self.employee_table.setItem(row, 0, QTableWidgetItem(str(employee.id)))
-            self.employee_table.setItem(row, 1, QTableWidgetItem(employee.name))
-            self.employee_table.setItem(row, 2, QTableWidgetItem(employee.position))
+    def update_employee_stats(self, employee_ids):
+        if employee_ids is None or self.stats_employee_combo.currentData() in employee_ids:
+            self.refresh_employee_stats()
 
-            date_obj = datetime.strptime(employee.hire_date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d.%m.%Y")
+    def update_company_stats(self, keys):
+        self.refresh_company_stats()
 
-            self.employee_table.setItem(row, 3, QTableWidgetItem(formatted_date))
+    def update_period_stats(self, keys):
+        self.refresh_period_stats()
 
-        self.employee_combo.clear()
-        self.stats_employee_combo.clear()
+    def query(self, key, method, args, callback):
+        # Тяжёлые запросы уходят в фоновый поток, если он есть; иначе выполняются сразу
+        if self.query_worker is not None:
+            self.query_worker.submit(key, method, args, callback)
+            return
 
-        for emp_data in employees:
-            employee = Employee.from_db_row(emp_data)
-            self.employee_combo.addItem(employee.name, employee.id)
-            self.stats_employee_combo.addItem(employee.name, employee.id)
+        try:
+            result = call_database(self.database, method, args)
+        except Exception as e:
+            self.on_query_failed(key, str(e))
+            return
+        callback(result)
 
-        if self.employee_combo.count() > 0:
-            employee_id = self.employee_combo.currentData()
-            self.refresh_time_history(employee_id)
+    def on_query_failed(self, key, message):
+        QMessageBox.warning(self, "Ошибка", f"Не удалось выполнить запрос: {message}")
 
     def refresh_employee_stats(self):
         if self.stats_employee_combo.currentIndex() < 0:
             return
 
         employee_id = self.stats_employee_combo.currentData()
-        stats = self.database.get_employee_stats(employee_id)
+        self.query("employee_stats", "get_employee_stats", (employee_id, *self.stats_period()),
+                   self.show_employee_stats)
 
+    def show_employee_stats(self, stats):
         self.employee_avg_delay.setText(stats["avg_delay"])
         self.employee_avg_overtime.setText(stats["avg_overtime"])
         self.employee_avg_workday.setText(stats["avg_workday"])
 
     def refresh_statistics(self):
-        company_stats = self.database.get_company_stats()
+        self.refresh_company_stats()
+        self.refresh_employee_stats()
+        self.refresh_period_stats()
+
+    def refresh_company_stats(self):
+        self.query("company_stats", "get_company_stats", self.stats_period(), self.show_company_stats)
+
+    def refresh_period_stats(self):
+        group_by = self.stats_group_by.currentData()
+        self.period_stats_group.setVisible(group_by is not None)
+        if group_by is not None:
+            self.query("period_stats", "get_period_stats", (group_by, *self.stats_period()),
+                       lambda periods: self.show_period_stats(group_by, periods))
+
+    def stats_period(self):
+        if self.stats_all_time.isChecked():
+            return (None, None)
+        return (_qdate_to_day(self.stats_date_from.date()), _qdate_to_day(self.stats_date_to.date()))
+
+    def on_stats_period_changed(self):
+        all_time = self.stats_all_time.isChecked()
+        self.stats_date_from.setEnabled(not all_time)
+        self.stats_date_to.setEnabled(not all_time)
+        self.mark_stats_dirty()
+
+    def export_report(self, report, default_name):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт", f"{default_name}.csv", "CSV (*.csv);;Excel (*.xlsx)"
+        )
+        if not path:
+            return
+
+        # Выгрузка идёт потоком из базы и выполняется в фоновом потоке, если он есть
+        self.query(f"export:{path}", export_report, (report, path, *self.stats_period()),
+                   lambda count: QMessageBox.information(self, "Экспорт", f"Выгружено строк: {count}"))
 
+    def show_period_stats(self, group_by, periods):
+        self.period_stats_table.setRowCount(len(periods))
+
+        for row, stats in enumerate(periods):
+            period = stats["period"]
+            if group_by == "week":
+                period = "Неделя с " + day_to_date(period).strftime("%d.%m.%Y")
+            elif group_by == "month":
+                period = f"{period[5:7]}.{period[0:4]}"
+
+            values = (period, str(stats["employees"]), str(stats["days"]),
+                      stats["avg_delay"], stats["avg_overtime"], stats["avg_workday"])
+            for column, value in enumerate(values):
+                self.period_stats_table.setItem(row, column, QTableWidgetItem(value))
+
+    def show_company_stats(self, company_stats):
         self.company_avg_delay.setText(company_stats["avg_delay"])
         self.company_avg_overtime.setText(company_stats["avg_overtime"])
         self.company_avg_workday.setText(company_stats["avg_workday"])
 
-        self.refresh_employee_stats()
-
     def on_employee_combo_changed(self, index):
         if index >= 0:
-            employee_id = self.employee_combo.currentData()
-            self.refresh_time_history(employee_id)
+            self.refresh_scheduler.mark("history")